@@ -0,0 +1,39 @@
+"""index related_edges.b_id
+
+Revision ID: 4008bc5bafd2
+Revises: 22b3bbda7c30
+Create Date: 2026-10-15 22:30:20.817117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4008bc5bafd2'
+down_revision: Union[str, Sequence[str], None] = '22b3bbda7c30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Postgres doesn't index FK columns on its own. Every other FK is covered
+    # (explicit index or leading PK column); related_edges.b_id is the trailing
+    # PK column, so cascades from abstract_nodes would seq-scan without this.
+    # CONCURRENTLY so a live table keeps taking writes; can't run in a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_related_edges_b_id",
+            "related_edges",
+            ["b_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_related_edges_b_id", table_name="related_edges", postgresql_concurrently=True)
@@ -0,0 +1,56 @@
+"""typed edge traversal indexes
+
+Revision ID: 85312953b177
+Revises: 966ea01944df
+Create Date: 2026-10-15 22:35:38.826131
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '85312953b177'
+down_revision: Union[str, Sequence[str], None] = '966ea01944df'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # (endpoint, type) answers "requires/recommended edges from/to X" from the
+    # index alone. ix_edges_dst_type leads with dst_impl_id, so it also replaces
+    # ix_edges_dst_impl_id.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_edges_src_type",
+            "edges",
+            ["src_impl_id", "type"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_edges_dst_type",
+            "edges",
+            ["dst_impl_id", "type"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index("ix_edges_dst_impl_id", table_name="edges", postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_edges_dst_impl_id",
+            "edges",
+            ["dst_impl_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index("ix_edges_dst_type", table_name="edges", postgresql_concurrently=True)
+        op.drop_index("ix_edges_src_type", table_name="edges", postgresql_concurrently=True)
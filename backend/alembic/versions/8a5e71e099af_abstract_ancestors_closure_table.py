@@ -0,0 +1,103 @@
+"""abstract_ancestors closure table
+
+Revision ID: 8a5e71e099af
+Revises: 94ac69e3156a
+Create Date: 2026-10-15 22:38:41.458991
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a5e71e099af'
+down_revision: Union[str, Sequence[str], None] = '94ac69e3156a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.models.ABSTRACT_ANCESTORS_DDL at this revision.
+CLOSURE_DDL = [
+    """
+    CREATE FUNCTION abstract_ancestors_rebuild(ids uuid[]) RETURNS void
+    LANGUAGE sql AS $$
+        DELETE FROM abstract_ancestors WHERE descendant_id = ANY(ids);
+        INSERT INTO abstract_ancestors (descendant_id, ancestor_id, depth)
+        WITH RECURSIVE chain(descendant_id, ancestor_id, depth) AS (
+            SELECT id, id, 0 FROM abstract_nodes WHERE id = ANY(ids)
+            UNION ALL
+            SELECT c.descendant_id, n.parent_id, c.depth + 1
+            FROM chain c
+            JOIN abstract_nodes n ON n.id = c.ancestor_id
+            WHERE n.parent_id IS NOT NULL
+        )
+        SELECT descendant_id, ancestor_id, depth FROM chain;
+    $$
+    """,
+    """
+    CREATE FUNCTION abstract_ancestors_on_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM abstract_ancestors_rebuild(ARRAY(SELECT id FROM new_rows));
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE FUNCTION abstract_ancestors_on_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        -- every node under a re-parented one gets a new ancestor chain
+        PERFORM abstract_ancestors_rebuild(ARRAY(
+            SELECT DISTINCT aa.descendant_id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN abstract_ancestors aa ON aa.ancestor_id = n.id
+            WHERE o.parent_id IS DISTINCT FROM n.parent_id
+        ));
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER trg_abstract_ancestors_insert
+    AFTER INSERT ON abstract_nodes
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION abstract_ancestors_on_insert()
+    """,
+    """
+    CREATE TRIGGER trg_abstract_ancestors_update
+    AFTER UPDATE ON abstract_nodes
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION abstract_ancestors_on_update()
+    """,
+]
+
+
+def upgrade():
+    op.create_table(
+        "abstract_ancestors",
+        sa.Column("descendant_id", UUID(as_uuid=True), sa.ForeignKey("abstract_nodes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("ancestor_id", UUID(as_uuid=True), sa.ForeignKey("abstract_nodes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("depth", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_abstract_ancestors_ancestor_id", "abstract_ancestors", ["ancestor_id"], unique=False)
+
+    for stmt in CLOSURE_DDL:
+        op.execute(stmt)
+
+    # backfill existing hierarchy
+    op.execute("SELECT abstract_ancestors_rebuild(ARRAY(SELECT id FROM abstract_nodes))")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER trg_abstract_ancestors_update ON abstract_nodes")
+    op.execute("DROP TRIGGER trg_abstract_ancestors_insert ON abstract_nodes")
+    op.execute("DROP FUNCTION abstract_ancestors_on_update()")
+    op.execute("DROP FUNCTION abstract_ancestors_on_insert()")
+    op.execute("DROP FUNCTION abstract_ancestors_rebuild(uuid[])")
+    op.drop_index("ix_abstract_ancestors_ancestor_id", table_name="abstract_ancestors")
+    op.drop_table("abstract_ancestors")
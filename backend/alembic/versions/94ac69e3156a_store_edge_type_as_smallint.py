@@ -0,0 +1,43 @@
+"""store edge type as smallint
+
+Revision ID: 94ac69e3156a
+Revises: 85312953b177
+Create Date: 2026-10-15 22:36:03.296843
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM
+
+
+# revision identifiers, used by Alembic.
+revision: str = '94ac69e3156a'
+down_revision: Union[str, Sequence[str], None] = '85312953b177'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # 2-byte code instead of a 4-byte enum OID: narrower rows and index keys
+    # (uq_edge_src_dst_type, ix_edges_*_type are rebuilt by the type change).
+    op.execute("""
+        ALTER TABLE edges
+        ALTER COLUMN type TYPE smallint
+        USING (CASE type WHEN 'requires' THEN 0 WHEN 'recommended' THEN 1 END)
+    """)
+    op.create_check_constraint("ck_edge_type_code", "edges", "type BETWEEN 0 AND 1")
+    ENUM(name="edge_type").drop(op.get_bind(), checkfirst=True)
+
+
+def downgrade():
+    edge_type = ENUM("requires", "recommended", name="edge_type")
+    edge_type.create(op.get_bind(), checkfirst=True)
+
+    op.drop_constraint("ck_edge_type_code", "edges", type_="check")
+    op.execute("""
+        ALTER TABLE edges
+        ALTER COLUMN type TYPE edge_type
+        USING (CASE type WHEN 0 THEN 'requires' WHEN 1 THEN 'recommended' END)::edge_type
+    """)
@@ -0,0 +1,38 @@
+"""partial index on core impls
+
+Revision ID: 966ea01944df
+Revises: d21efd80aea1
+Create Date: 2026-10-15 22:32:57.505339
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '966ea01944df'
+down_revision: Union[str, Sequence[str], None] = 'd21efd80aea1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # abstract_id -> core impl is the default-impl lookup; core rows only,
+    # so this stays ~1/variants the size of uq_impl_abstract_variant.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_impl_nodes_abstract_core",
+            "impl_nodes",
+            ["abstract_id"],
+            unique=True,
+            postgresql_where=sa.text("variant_key = 'core'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_impl_nodes_abstract_core", table_name="impl_nodes", postgresql_concurrently=True)
@@ -0,0 +1,28 @@
+"""drop redundant related pair unique constraint
+
+Revision ID: 9eaf85478aa0
+Revises: ffa9f54413ed
+Create Date: 2026-10-15 23:06:08.276220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9eaf85478aa0'
+down_revision: Union[str, Sequence[str], None] = 'ffa9f54413ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # (a_id, b_id) is already the primary key; the model no longer declares the
+    # duplicate unique constraint, so drop it to match create_all/bootstrap_db
+    op.drop_constraint("uq_related_pair", "related_edges", type_="unique")
+
+
+def downgrade():
+    op.create_unique_constraint("uq_related_pair", "related_edges", ["a_id", "b_id"])
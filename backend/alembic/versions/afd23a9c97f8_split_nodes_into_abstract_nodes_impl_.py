@@ -5,6 +5,7 @@ Revises: c38c02a7307b
 Create Date: 2025-12-15 23:25:53.105063
 
 """
+import uuid
 from typing import Sequence, Union
 
 from alembic import op
@@ -17,8 +18,53 @@ down_revision: Union[str, Sequence[str], None] = 'c38c02a7307b'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# Data moves below are chunked so no single statement has to materialize a
+# whole table; each batch is keyset-paginated on the source's `id`.
+BATCH_SIZE = 10_000
+
+
+def _copy_in_batches(*, source: str, insert: str) -> None:
+    """
+    Run `insert` repeatedly, each time over the next BATCH_SIZE rows of `source`.
+    `insert` reads those rows from a CTE named `batch`.
+    """
+    stmt = sa.text(f"""
+        WITH batch AS (
+            SELECT * FROM {source}
+            WHERE id > :last
+            ORDER BY id
+            LIMIT :limit
+        ), ins AS (
+            {insert}
+        )
+        SELECT id FROM batch ORDER BY id DESC LIMIT 1
+    """)
+
+    bind = op.get_bind()
+    last = uuid.UUID(int=0)
+    while True:
+        last = bind.execute(stmt, {"last": last, "limit": BATCH_SIZE}).scalar()
+        if last is None:
+            break
+
+
+def _create_core_map() -> None:
+    """Temp table core_map(abstract_id, impl_id) of every 'core' impl, indexed both ways."""
+    op.execute("""
+        CREATE TEMP TABLE core_map AS
+        SELECT abstract_id, id AS impl_id
+        FROM impl_nodes
+        WHERE variant_key = 'core'
+    """)
+    op.execute("CREATE UNIQUE INDEX ON core_map (abstract_id)")
+    op.execute("CREATE UNIQUE INDEX ON core_map (impl_id)")
+    op.execute("ANALYZE core_map")
+
+
 def upgrade():
     # 1) Create abstract_nodes (new)
+    # Secondary indexes on the new tables are built after their data is copied
+    # in (steps 5-7): one sorted bulk build is much cheaper than per-row upkeep.
     op.create_table(
         "abstract_nodes",
         sa.Column("id", UUID(as_uuid=True), primary_key=True, nullable=False),
@@ -31,9 +77,6 @@ def upgrade():
         sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
         sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
     )
-    op.create_index("ix_abstract_nodes_slug", "abstract_nodes", ["slug"], unique=True)
-    op.create_index("ix_abstract_nodes_parent_id", "abstract_nodes", ["parent_id"], unique=False)
-    op.create_index("ix_abstract_nodes_short_title", "abstract_nodes", ["short_title"], unique=True)
 
     # 2) Create impl_nodes
     op.create_table(
@@ -46,7 +89,6 @@ def upgrade():
         sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
         sa.UniqueConstraint("abstract_id", "variant_key", name="uq_impl_abstract_variant"),
     )
-    op.create_index("ix_impl_nodes_abstract_id", "impl_nodes", ["abstract_id"], unique=False)
 
     # 3) Create new edges table layout (same name "edges" but different columns)
     # We'll rename old edges first to avoid name collision.
@@ -67,8 +109,6 @@ def upgrade():
         sa.Column("rank", sa.Integer(), nullable=True),
         sa.UniqueConstraint("src_impl_id", "dst_impl_id", "type", name="uq_edge_src_dst_type"),
     )
-    op.create_index("ix_edges_src_impl_id", "edges", ["src_impl_id"], unique=False)
-    op.create_index("ix_edges_dst_impl_id", "edges", ["dst_impl_id"], unique=False)
 
     # 4) related_edges references nodes.id currently; rename + recreate with abstract FK
     op.rename_table("related_edges", "related_edges_old")
@@ -88,35 +128,57 @@ def upgrade():
     # 5) Move nodes -> abstract_nodes (keep same IDs)
     op.rename_table("nodes", "nodes_old")
 
-    op.execute("""
-        INSERT INTO abstract_nodes (id, slug, title, short_title, summary, body_md, parent_id, created_at, updated_at)
-        SELECT id, slug, title, short_title, summary, body_md, NULL, created_at, updated_at
-        FROM nodes_old
-    """)
+    _copy_in_batches(
+        source="nodes_old",
+        insert="""
+            INSERT INTO abstract_nodes (id, slug, title, short_title, summary, body_md, parent_id, created_at, updated_at)
+            SELECT id, slug, title, short_title, summary, body_md, NULL, created_at, updated_at
+            FROM batch
+        """,
+    )
+
+    op.create_index("ix_abstract_nodes_slug", "abstract_nodes", ["slug"], unique=True)
+    op.create_index("ix_abstract_nodes_parent_id", "abstract_nodes", ["parent_id"], unique=False)
+    op.create_index("ix_abstract_nodes_short_title", "abstract_nodes", ["short_title"], unique=True)
 
     # 6) Create default impl ("core") for each abstract node
-    op.execute("""
-        INSERT INTO impl_nodes (id, abstract_id, variant_key, contract_md, created_at, updated_at)
-        SELECT gen_random_uuid(), id, 'core', NULL, created_at, updated_at
-        FROM abstract_nodes
-    """)
+    _copy_in_batches(
+        source="abstract_nodes",
+        insert="""
+            INSERT INTO impl_nodes (id, abstract_id, variant_key, contract_md, created_at, updated_at)
+            SELECT gen_random_uuid(), id, 'core', NULL, created_at, updated_at
+            FROM batch
+        """,
+    )
+
+    op.create_index("ix_impl_nodes_abstract_id", "impl_nodes", ["abstract_id"], unique=False)
 
     # 7) Migrate old edges: node->node becomes impl(core)->impl(core)
-    # Join via abstract_id and variant_key='core'
-    op.execute("""
-        INSERT INTO edges (id, src_impl_id, dst_impl_id, type, rank)
-        SELECT
-            gen_random_uuid(),
-            s_impl.id,
-            d_impl.id,
-            e.type,
-            e.rank
-        FROM edges_old e
-        JOIN impl_nodes s_impl ON s_impl.abstract_id = e.src_id AND s_impl.variant_key = 'core'
-        JOIN impl_nodes d_impl ON d_impl.abstract_id = e.dst_id AND d_impl.variant_key = 'core'
-    """)
+    # Resolve abstract_id -> core impl once into a small map, so each edge is
+    # two probes on it instead of two joins over all of impl_nodes.
+    _create_core_map()
+    _copy_in_batches(
+        source="edges_old",
+        insert="""
+            INSERT INTO edges (id, src_impl_id, dst_impl_id, type, rank)
+            SELECT
+                gen_random_uuid(),
+                s.impl_id,
+                d.impl_id,
+                e.type,
+                e.rank
+            FROM batch e
+            JOIN core_map s ON s.abstract_id = e.src_id
+            JOIN core_map d ON d.abstract_id = e.dst_id
+        """,
+    )
+    op.execute("DROP TABLE core_map")
+
+    op.create_index("ix_edges_src_impl_id", "edges", ["src_impl_id"], unique=False)
+    op.create_index("ix_edges_dst_impl_id", "edges", ["dst_impl_id"], unique=False)
 
     # 8) Migrate related_edges (IDs are the same, now point to abstract_nodes)
+    # No surrogate id to paginate on; one row per related pair, so copy in one go.
     op.execute("""
         INSERT INTO related_edges (a_id, b_id)
         SELECT a_id, b_id
@@ -174,6 +236,7 @@ def downgrade():
     """)
 
     # edges impl->impl collapse to abstract->abstract using core impls only
+    _create_core_map()
     op.execute("""
         INSERT INTO edges_old (id, src_id, dst_id, type, rank)
         SELECT
@@ -183,9 +246,10 @@ def downgrade():
             e.type,
             e.rank
         FROM edges e
-        JOIN impl_nodes s ON s.id = e.src_impl_id AND s.variant_key = 'core'
-        JOIN impl_nodes d ON d.id = e.dst_impl_id AND d.variant_key = 'core'
+        JOIN core_map s ON s.impl_id = e.src_impl_id
+        JOIN core_map d ON d.impl_id = e.dst_impl_id
     """)
+    op.execute("DROP TABLE core_map")
 
     # related_edges stays same ids -> nodes
     op.execute("""
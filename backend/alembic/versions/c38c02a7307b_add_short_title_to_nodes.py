@@ -17,6 +17,8 @@ down_revision: Union[str, Sequence[str], None] = '8e5e5500c166'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+BACKFILL_BATCH_SIZE = 5_000
+
 
 def upgrade():
     op.add_column(
@@ -24,15 +26,27 @@ def upgrade():
         sa.Column("short_title", sa.String(length=30), nullable=True)
     )
 
-    # backfill from title (truncate safely)
-    op.execute("""
+    # backfill from title (truncate safely), in bounded batches
+    backfill = sa.text("""
         UPDATE nodes
         SET short_title = LEFT(title, 30)
-        WHERE short_title IS NULL
+        WHERE ctid IN (
+            SELECT ctid FROM nodes WHERE short_title IS NULL LIMIT :limit
+        )
     """)
+    bind = op.get_bind()
+    while bind.execute(backfill, {"limit": BACKFILL_BATCH_SIZE}).rowcount:
+        pass
 
+    # NOT NULL via a validated CHECK: VALIDATE only needs SHARE UPDATE EXCLUSIVE,
+    # and SET NOT NULL then trusts the constraint instead of rescanning (PG12+).
+    op.execute("""
+        ALTER TABLE nodes
+        ADD CONSTRAINT ck_nodes_short_title_not_null CHECK (short_title IS NOT NULL) NOT VALID
+    """)
+    op.execute("ALTER TABLE nodes VALIDATE CONSTRAINT ck_nodes_short_title_not_null")
     op.alter_column("nodes", "short_title", nullable=False)
-
+    op.drop_constraint("ck_nodes_short_title_not_null", "nodes", type_="check")
 
 
 def downgrade():
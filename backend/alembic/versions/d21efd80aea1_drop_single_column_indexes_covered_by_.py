@@ -0,0 +1,47 @@
+"""drop single-column indexes covered by composites
+
+Revision ID: d21efd80aea1
+Revises: 4008bc5bafd2
+Create Date: 2026-10-15 22:30:43.974383
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd21efd80aea1'
+down_revision: Union[str, Sequence[str], None] = '4008bc5bafd2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Both are the leading column of a composite unique index
+    # (uq_impl_abstract_variant / uq_edge_src_dst_type), which already serves
+    # lookups and FK cascades on that column.
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_impl_nodes_abstract_id", table_name="impl_nodes", postgresql_concurrently=True)
+        op.drop_index("ix_edges_src_impl_id", table_name="edges", postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_edges_src_impl_id",
+            "edges",
+            ["src_impl_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_impl_nodes_abstract_id",
+            "impl_nodes",
+            ["abstract_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
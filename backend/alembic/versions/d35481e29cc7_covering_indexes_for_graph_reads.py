@@ -0,0 +1,73 @@
+"""covering indexes for graph reads
+
+Revision ID: d35481e29cc7
+Revises: 8a5e71e099af
+Create Date: 2026-10-15 22:47:32.227374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd35481e29cc7'
+down_revision: Union[str, Sequence[str], None] = '8a5e71e099af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _swap_index(name: str, table: str, columns: list[str], include: list[str]) -> None:
+    """Rebuild index `name` with a new INCLUDE list without blocking writes."""
+    tmp = f"{name}_new"
+    op.create_index(
+        tmp,
+        table,
+        columns,
+        unique=False,
+        postgresql_include=include,
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.execute(f"ALTER INDEX {tmp} RENAME TO {name}")
+
+
+def _swap_impl_unique(include: list[str]) -> None:
+    # a unique constraint can adopt a (concurrently built) unique index, which
+    # renames it to the constraint name
+    op.create_index(
+        "uq_impl_abstract_variant_new",
+        "impl_nodes",
+        ["abstract_id", "variant_key"],
+        unique=True,
+        postgresql_include=include,
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.execute(
+        "ALTER TABLE impl_nodes "
+        "DROP CONSTRAINT uq_impl_abstract_variant, "
+        "ADD CONSTRAINT uq_impl_abstract_variant UNIQUE USING INDEX uq_impl_abstract_variant_new"
+    )
+
+
+def upgrade():
+    # Carry the columns the graph reads select, so they are answered by
+    # index-only scans:
+    # - impl_nodes (abstract_id, variant_key) + id: default-impl window and the
+    #   focus inside-impl id subquery
+    # - edges (src|dst, type) + the other endpoint, id, rank: the focus
+    #   touching-edges UNION ALL
+    with op.get_context().autocommit_block():
+        _swap_impl_unique(["id"])
+        _swap_index("ix_edges_src_type", "edges", ["src_impl_id", "type"], ["id", "dst_impl_id", "rank"])
+        _swap_index("ix_edges_dst_type", "edges", ["dst_impl_id", "type"], ["id", "src_impl_id", "rank"])
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        _swap_index("ix_edges_dst_type", "edges", ["dst_impl_id", "type"], [])
+        _swap_index("ix_edges_src_type", "edges", ["src_impl_id", "type"], [])
+        _swap_impl_unique([])
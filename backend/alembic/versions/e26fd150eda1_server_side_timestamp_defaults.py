@@ -0,0 +1,35 @@
+"""server-side timestamp defaults
+
+Revision ID: e26fd150eda1
+Revises: d35481e29cc7
+Create Date: 2026-10-15 22:51:04.665002
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e26fd150eda1'
+down_revision: Union[str, Sequence[str], None] = 'd35481e29cc7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ("abstract_nodes", "impl_nodes")
+COLUMNS = ("created_at", "updated_at")
+
+
+def upgrade():
+    # metadata-only: existing rows keep their values, new rows get now() from the DB
+    for table in TABLES:
+        for column in COLUMNS:
+            op.alter_column(table, column, server_default=sa.func.now())
+
+
+def downgrade():
+    for table in TABLES:
+        for column in COLUMNS:
+            op.alter_column(table, column, server_default=None)
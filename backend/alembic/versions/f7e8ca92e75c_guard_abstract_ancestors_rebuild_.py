@@ -0,0 +1,73 @@
+"""guard abstract_ancestors_rebuild against parent cycles
+
+Revision ID: f7e8ca92e75c
+Revises: 9eaf85478aa0
+Create Date: 2026-10-15 23:16:06.041422
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7e8ca92e75c'
+down_revision: Union[str, Sequence[str], None] = '9eaf85478aa0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copies of abstract_ancestors_rebuild before and after this revision.
+REBUILD_GUARDED = """
+CREATE OR REPLACE FUNCTION abstract_ancestors_rebuild(ids uuid[]) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    looped uuid;
+BEGIN
+    DELETE FROM abstract_ancestors WHERE descendant_id = ANY(ids);
+    WITH RECURSIVE chain(descendant_id, ancestor_id, depth) AS (
+        SELECT id, id, 0 FROM abstract_nodes WHERE id = ANY(ids)
+        UNION ALL
+        SELECT c.descendant_id, n.parent_id, c.depth + 1
+        FROM chain c
+        JOIN abstract_nodes n ON n.id = c.ancestor_id
+        WHERE n.parent_id IS NOT NULL
+    ) CYCLE ancestor_id SET is_cycle USING path,
+    inserted AS (
+        INSERT INTO abstract_ancestors (descendant_id, ancestor_id, depth)
+        SELECT descendant_id, ancestor_id, depth FROM chain WHERE NOT is_cycle
+    )
+    SELECT descendant_id INTO looped FROM chain WHERE is_cycle LIMIT 1;
+    IF looped IS NOT NULL THEN
+        RAISE EXCEPTION 'abstract_nodes parent_id cycle through %', looped
+            USING ERRCODE = 'check_violation';
+    END IF;
+END
+$$
+"""
+
+REBUILD_UNGUARDED = """
+CREATE OR REPLACE FUNCTION abstract_ancestors_rebuild(ids uuid[]) RETURNS void
+LANGUAGE sql AS $$
+    DELETE FROM abstract_ancestors WHERE descendant_id = ANY(ids);
+    INSERT INTO abstract_ancestors (descendant_id, ancestor_id, depth)
+    WITH RECURSIVE chain(descendant_id, ancestor_id, depth) AS (
+        SELECT id, id, 0 FROM abstract_nodes WHERE id = ANY(ids)
+        UNION ALL
+        SELECT c.descendant_id, n.parent_id, c.depth + 1
+        FROM chain c
+        JOIN abstract_nodes n ON n.id = c.ancestor_id
+        WHERE n.parent_id IS NOT NULL
+    )
+    SELECT descendant_id, ancestor_id, depth FROM chain;
+$$
+"""
+
+
+def upgrade():
+    op.execute(REBUILD_GUARDED)
+
+
+def downgrade():
+    op.execute(REBUILD_UNGUARDED)
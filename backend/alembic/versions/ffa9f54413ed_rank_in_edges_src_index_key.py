@@ -0,0 +1,48 @@
+"""rank in edges src index key
+
+Revision ID: ffa9f54413ed
+Revises: e26fd150eda1
+Create Date: 2026-10-15 22:52:05.785435
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ffa9f54413ed'
+down_revision: Union[str, Sequence[str], None] = 'e26fd150eda1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # rank moves from INCLUDE into the key: "type X edges out of impl Y by rank"
+    # (ordered recommendations) is then an ordered index-only scan
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_edges_src_type_rank",
+            "edges",
+            ["src_impl_id", "type", "rank"],
+            unique=False,
+            postgresql_include=["id", "dst_impl_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index("ix_edges_src_type", table_name="edges", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_edges_src_type",
+            "edges",
+            ["src_impl_id", "type"],
+            unique=False,
+            postgresql_include=["id", "dst_impl_id", "rank"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index("ix_edges_src_type_rank", table_name="edges", postgresql_concurrently=True, if_exists=True)
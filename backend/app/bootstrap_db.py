@@ -0,0 +1,84 @@
+"""
+Bring a database to the current schema.
+
+Fresh database (no alembic_version table): create the final schema straight
+from the models in one transaction and stamp alembic head, instead of replaying
+every historical migration (intermediate schemas + data copies) from scratch.
+Existing database: plain `alembic upgrade head`.
+
+Because a fresh database never replays the migrations, `--check-migrations`
+replays them all on a scratch database and runs `alembic check` against the
+models; CI runs it before bootstrapping.
+
+Usage (from backend/):  python -m app.bootstrap_db [--check-migrations]
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, make_url, text
+
+from .models import ABSTRACT_NODE_KIND_PG, Base
+
+
+def _sync_url() -> str:
+    # same swap as alembic/env.py: migrations run on psycopg, the app on asyncpg
+    return os.environ["DATABASE_URL"].replace("postgresql+asyncpg://", "postgresql+psycopg://")
+
+
+def bootstrap(alembic_ini: str = "alembic.ini") -> None:
+    cfg = Config(alembic_ini)
+    engine = create_engine(_sync_url())
+    try:
+        with engine.begin() as conn:
+            fresh = not inspect(conn).has_table("alembic_version")
+            if fresh:
+                # create_type=False on the model column, so the enum is created here
+                ABSTRACT_NODE_KIND_PG.create(conn, checkfirst=True)
+                Base.metadata.create_all(conn)
+    finally:
+        engine.dispose()
+
+    if fresh:
+        command.stamp(cfg, "head")
+    else:
+        command.upgrade(cfg, "head")
+
+
+def check_migrations(alembic_ini: str = "alembic.ini") -> None:
+    """
+    Upgrade an empty scratch database (<db>_migrations) to head, then fail if the
+    result differs from the models (`alembic check`). The scratch database is
+    dropped afterwards.
+    """
+    url = make_url(os.environ["DATABASE_URL"])
+    scratch = url.set(database=f"{url.database}_migrations")
+    admin = create_engine(make_url(_sync_url()).set(database="postgres"), isolation_level="AUTOCOMMIT")
+
+    def recreate(create: bool) -> None:
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{scratch.database}"'))
+            if create:
+                conn.execute(text(f'CREATE DATABASE "{scratch.database}"'))
+
+    # alembic/env.py reads DATABASE_URL, so point it at the scratch database
+    os.environ["DATABASE_URL"] = scratch.render_as_string(hide_password=False)
+    recreate(create=True)
+    try:
+        cfg = Config(alembic_ini)
+        command.upgrade(cfg, "head")
+        command.check(cfg)
+    finally:
+        os.environ["DATABASE_URL"] = url.render_as_string(hide_password=False)
+        recreate(create=False)
+        admin.dispose()
+
+
+if __name__ == "__main__":
+    if "--check-migrations" in sys.argv[1:]:
+        check_migrations()
+    else:
+        bootstrap()
@@ -1,42 +1,141 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from functools import lru_cache
+from typing import AsyncIterator, Sequence
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Executable, Row, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+log = logging.getLogger("db")
 
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
     DATABASE_URL: str
 
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 300  # seconds
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 256
+    DB_QUERY_CACHE_SIZE: int = 1200  # SQLAlchemy compiled-SQL cache entries
+    DB_INSERTMANYVALUES_PAGE_SIZE: int = 1000  # rows per batched multi-VALUES INSERT
+    DB_POOL_WARM: int = 10  # connections opened at startup (capped at DB_POOL_SIZE)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Parse env/.env once per process; cache_clear() it and get_engine to re-read."""
+    return Settings()
+
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_engine() -> AsyncEngine:
+    """The process's only engine/pool, built on first use from get_settings()."""
+    settings = get_settings()
+    return create_async_engine(
+        settings.DATABASE_URL,
+        echo=False,
+        # No SELECT 1 per checkout: connections are recycled before idle timeouts,
+        # and a disconnect error invalidates the whole pool so the next checkout
+        # reconnects. Flip DB_POOL_PRE_PING on for flaky networks.
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        # executemany of an INSERT (ORM add_all flushes, Core insert() with a list of
+        # rows + RETURNING) is rewritten into multi-row INSERT ... VALUES pages;
+        # asyncpg has no psycopg2-style executemany_mode, this is its equivalent knob
+        insertmanyvalues_page_size=settings.DB_INSERTMANYVALUES_PAGE_SIZE,
+        connect_args={
+            # SQLAlchemy-side cache of asyncpg prepared statements, per connection
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            # short OLTP queries: JIT compile time costs more than it saves
+            "server_settings": {"jit": "off"},
+        },
+    )
 
-engine: AsyncEngine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-)
 
-# canonical sessionmaker (import this in tests)
-async_session_maker = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+@lru_cache(maxsize=1)
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Canonical sessionmaker (use this in tests), bound to get_engine()."""
+    return async_sessionmaker(bind=get_engine(), expire_on_commit=False)
 
 
 @asynccontextmanager
 async def session_scope() -> AsyncIterator[AsyncSession]:
     """Use this outside FastAPI dependency injection (tests, scripts, one-offs)."""
-    async with async_session_maker() as session:
+    async with get_session_maker()() as session:
         yield session
 
 
+async def fetch_all(stmt: Executable) -> Sequence[Row]:
+    """
+    Run a read-only statement on its own pooled session and return all rows.
+    An AsyncSession can't run statements concurrently; use this for the extra
+    queries of an asyncio.gather fan-out.
+    """
+    async with session_scope() as session:
+        return (await session.execute(stmt)).all()
+
+
+async def stream_all(
+    stmt: Executable, *, yield_per: int = 2_000, snapshot: str | None = None
+) -> AsyncIterator[Row]:
+    """
+    Like fetch_all, but yields rows as they arrive from a server-side cursor
+    (yield_per rows per round-trip), so callers can build their output while
+    the rest of the result is still in flight and never hold the full row list.
+
+    snapshot: a pg_export_snapshot() id from a still-open transaction; the read
+    then sees exactly that transaction's data (see export_snapshot).
+    """
+    async with session_scope() as session:
+        if snapshot is not None:
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            # SET TRANSACTION takes no bind parameters; the id is server-issued
+            await session.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot}'"))
+        result = await session.stream(stmt.execution_options(yield_per=yield_per))
+        async for row in result:
+            yield row
+
+
+async def export_snapshot(session: AsyncSession) -> str:
+    """
+    Start a REPEATABLE READ transaction on session and export its snapshot, so
+    helper sessions (stream_all(snapshot=...)) read the same state as it does.
+    Must be the session's first statement; the id stays valid while it is open.
+    """
+    conn = await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    return (await conn.execute(text("SELECT pg_export_snapshot()"))).scalar_one()
+
+
+async def warm_pool() -> None:
+    """
+    Open DB_POOL_WARM connections and hand them back to the pool, so the first
+    burst of requests doesn't pay connect + auth + server_settings each.
+    Best effort: if the database isn't reachable yet the pool just fills lazily.
+    """
+    settings = get_settings()
+    n = min(settings.DB_POOL_WARM, settings.DB_POOL_SIZE)
+    if n <= 0:
+        return
+    # hold them all at once, otherwise the pool would hand the same one back
+    engine = get_engine()
+    results = await asyncio.gather(*(engine.connect() for _ in range(n)), return_exceptions=True)
+    conns = [c for c in results if isinstance(c, AsyncConnection)]
+    await asyncio.gather(*(c.close() for c in conns))
+    if len(conns) < n:
+        err = next(r for r in results if not isinstance(r, AsyncConnection))
+        log.warning("pool warm-up opened %s/%s connections: %r", len(conns), n, err)
+
+
 # FastAPI dependency (unchanged semantics)
 async def get_session() -> AsyncIterator[AsyncSession]:
-    async with async_session_maker() as session:
+    async with session_scope() as session:
         yield session
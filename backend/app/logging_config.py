@@ -6,6 +6,15 @@ def setup_logging() -> None:
     level_name = os.getenv("LOG_LEVEL", "INFO").upper()
     level = getattr(logging, level_name, logging.INFO)
 
+    # The format below doesn't use process/thread/task fields, so skip the
+    # getpid()/current_thread()/current_task() lookups on every record.
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging.logThreads = False
+    logging.logAsyncioTasks = False
+    # Handler errors only print tracebacks when debugging.
+    logging.raiseExceptions = level <= logging.DEBUG
+
     root = logging.getLogger()
     root.handlers.clear()
     root.setLevel(level)
@@ -13,12 +22,17 @@ def setup_logging() -> None:
     h = logging.StreamHandler(sys.stdout)
     h.setLevel(level)
     fmt = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+        "%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+        datefmt="%Y-%m-%dT%H:%M:%S",
     )
     h.setFormatter(fmt)
     root.addHandler(h)
 
     # Optional: make SQLAlchemy noisy when you need it
-    if os.getenv("SQL_DEBUG", "0") == "1":
-        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
-        logging.getLogger("sqlalchemy.pool").setLevel(logging.INFO)
+    # (pointless above INFO: the root handler would drop those records anyway)
+    sql_debug = os.getenv("SQL_DEBUG", "0") == "1" and level <= logging.INFO
+    # Otherwise pin them to WARNING so LOG_LEVEL=debug doesn't turn on per-statement
+    # (and per-row) SQLAlchemy logging; warnings still propagate to root.
+    sql_level = logging.INFO if sql_debug else logging.WARNING
+    for name in ("sqlalchemy.engine", "sqlalchemy.pool", "sqlalchemy.dialects"):
+        logging.getLogger(name).setLevel(sql_level)
@@ -1,11 +1,129 @@
 from __future__ import annotations
 
 import uuid
-import networkx as nx
+from collections import deque
+
+
+class RequiresIndex:
+    """
+    Acyclic requires-edge set with a maintained topological order (Pearce-Kelly
+    dynamic topological sort), kept across inserts so repeated cycle checks don't
+    rebuild anything from the full edge list.
+
+    An edge src -> dst with ord[src] < ord[dst] can't close a cycle, which is
+    answered in O(1). Otherwise only nodes whose order lies between dst and src
+    are searched, and only those are renumbered on insert.
+
+    The initial edges must be acyclic: the constructor raises ValueError naming
+    the nodes on (or behind) a cycle.
+    """
+
+    __slots__ = ("_succ", "_pred", "_ord")
+
+    def __init__(self, edges: list[tuple[uuid.UUID, uuid.UUID]] = ()) -> None:
+        self._succ: dict[uuid.UUID, list[uuid.UUID]] = {}
+        self._pred: dict[uuid.UUID, list[uuid.UUID]] = {}
+        for a, b in edges:
+            self._succ.setdefault(a, []).append(b)
+            self._pred.setdefault(b, []).append(a)
+        order, cyclic = _topo_order(self._succ, edges)
+        if cyclic:
+            raise ValueError(f"requires edges contain a cycle through: {sorted(map(str, cyclic))}")
+        self._ord: dict[uuid.UUID, int] = {n: i for i, n in enumerate(order)}
+
+    def _forward(self, start: uuid.UUID, upper: int) -> list[uuid.UUID] | None:
+        # nodes reachable from start with ord <= upper; None if that includes the
+        # node at `upper` itself (the new edge's src, i.e. a cycle)
+        ord_, succ = self._ord, self._succ
+        seen = {start}
+        stack = [start]
+        while stack:
+            for m in succ.get(stack.pop(), ()):
+                o = ord_[m]
+                if o == upper:
+                    return None
+                if o < upper and m not in seen:
+                    seen.add(m)
+                    stack.append(m)
+        return list(seen)
+
+    def _backward(self, start: uuid.UUID, lower: int) -> list[uuid.UUID]:
+        # nodes that reach start with ord > lower
+        ord_, pred = self._ord, self._pred
+        seen = {start}
+        stack = [start]
+        while stack:
+            for m in pred.get(stack.pop(), ()):
+                if ord_[m] > lower and m not in seen:
+                    seen.add(m)
+                    stack.append(m)
+        return list(seen)
+
+    def would_create_cycle(self, src: uuid.UUID, dst: uuid.UUID) -> bool:
+        if src == dst:
+            return True
+        # a node without edges yet can't be on a path between the other two
+        lo, hi = self._ord.get(dst), self._ord.get(src)
+        if lo is None or hi is None or hi < lo:
+            return False
+        return self._forward(dst, hi) is None
+
+    def add(self, src: uuid.UUID, dst: uuid.UUID) -> None:
+        """Record src -> dst; raises ValueError if it would close a cycle."""
+        if src == dst:
+            raise ValueError(f"edge would create cycle: {src} -> {dst}")
+        ord_ = self._ord
+        for n in (src, dst):
+            if n not in ord_:
+                ord_[n] = len(ord_)
+
+        lo, hi = ord_[dst], ord_[src]
+        if hi > lo:
+            # dst sits before src: reorder the affected region so that everything
+            # reaching src comes before everything reachable from dst
+            fwd = self._forward(dst, hi)
+            if fwd is None:
+                raise ValueError(f"edge would create cycle: {src} -> {dst}")
+            bwd = self._backward(src, lo)
+            fwd.sort(key=ord_.__getitem__)
+            bwd.sort(key=ord_.__getitem__)
+            slots = sorted(ord_[n] for n in bwd + fwd)
+            for n, o in zip(bwd + fwd, slots):
+                ord_[n] = o
+
+        self._succ.setdefault(src, []).append(dst)
+        self._pred.setdefault(dst, []).append(src)
 
 
 def would_create_cycle(existing_requires: list[tuple[uuid.UUID, uuid.UUID]], new_edge: tuple[uuid.UUID, uuid.UUID]) -> bool:
-    g = nx.DiGraph()
-    g.add_edges_from(existing_requires)
-    g.add_edge(*new_edge)
-    return not nx.is_directed_acyclic_graph(g)
+    # one-off check; keep a RequiresIndex around when checking many inserts.
+    # An existing set that is already cyclic stays cyclic with the new edge.
+    try:
+        index = RequiresIndex(existing_requires)
+    except ValueError:
+        return True
+    return index.would_create_cycle(*new_edge)
+
+
+def _topo_order(
+    adj: dict[uuid.UUID, list[uuid.UUID]], edges: list[tuple[uuid.UUID, uuid.UUID]]
+) -> tuple[list[uuid.UUID], set[uuid.UUID]]:
+    # Kahn's algorithm, O(V + E): peel off zero-indegree nodes; whatever can't be
+    # peeled lies on (or behind) a cycle. Returns (peeled order, leftover nodes).
+    indeg: dict[uuid.UUID, int] = {}
+    for a, b in edges:
+        indeg.setdefault(a, 0)
+        indeg[b] = indeg.get(b, 0) + 1
+
+    order: list[uuid.UUID] = []
+    queue = deque(n for n, d in indeg.items() if d == 0)
+    while queue:
+        n = queue.popleft()
+        del indeg[n]
+        order.append(n)
+        for m in adj.get(n, ()):
+            indeg[m] -= 1
+            if indeg[m] == 0:
+                queue.append(m)
+    return order, set(indeg)
+
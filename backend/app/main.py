@@ -1,24 +1,44 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import Depends, FastAPI, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .db import get_session
+from .db import get_engine, get_session, warm_pool
+from .schemas import NodeCreateIn
 from .seed import seed_minimal
+from .services.graph import watch_graph_changes
 
 from .routes.graph_router import router as graph_router
 from .logging_config import setup_logging
 setup_logging()
 
-app = FastAPI(title="SkillTree MVP")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_pool()
+    watcher = asyncio.create_task(watch_graph_changes())
+    yield
+    watcher.cancel()
+    with suppress(asyncio.CancelledError):
+        await watcher
+    await get_engine().dispose()
+
+
+# exact-match origins only: no allow_origin_regex, so CORS checks are set lookups
+ALLOWED_ORIGINS = (
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+)
+
+app = FastAPI(title="SkillTree MVP", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-    ],
+    allow_origins=list(ALLOWED_ORIGINS),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -1,20 +1,28 @@
 from __future__ import annotations
 
 import enum
+import os
+import time
 import uuid
 from datetime import datetime
 
 from sqlalchemy import (
+    DDL,
     DateTime,
-    Enum,
     ForeignKey,
+    Index,
     Integer,
+    SmallInteger,
     String,
     Text,
+    TypeDecorator,
     UniqueConstraint,
     CheckConstraint,
+    event,
     exists,
+    func,
     select,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.dialects.postgresql import ENUM as PG_ENUM
@@ -22,6 +30,25 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship,
 from sqlalchemy.ext.hybrid import hybrid_property
 
 
+# Outside prod, relationships never lazy-load: touching an unloaded one raises,
+# so N+1 patterns surface where they are written. Load what you need with
+# selectinload()/joinedload(). Child deletes rely on the FKs' ON DELETE CASCADE
+# (passive_deletes) instead of loading collections.
+RELATIONSHIP_LAZY = "select" if os.getenv("APP_ENV", "dev") == "prod" else "raise_on_sql"
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48-bit millisecond timestamp, then
+    random bits. New rows land at the right edge of the primary-key B-tree
+    instead of on a random page, and ids are known client-side before INSERT.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10))
+    value = value & ~(0xF << 76) | 0x7 << 76  # version
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -40,10 +67,10 @@ class AbstractNodeKind(str, enum.Enum):
 class AbstractNode(Base):
     __tablename__ = "abstract_nodes"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     slug: Mapped[str] = mapped_column(String(120), unique=True, index=True)
     title: Mapped[str] = mapped_column(String(200))
-    short_title: Mapped[str] = mapped_column(String(30), unique=True)
+    short_title: Mapped[str] = mapped_column(String(30), unique=True, index=True)
     summary: Mapped[str | None] = mapped_column(String(500), nullable=True)
     body_md: Mapped[str | None] = mapped_column(Text, nullable=True)
 
@@ -51,12 +78,16 @@ class AbstractNode(Base):
         UUID(as_uuid=True), ForeignKey("abstract_nodes.id", ondelete="SET NULL"), nullable=True, index=True
     )
 
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
-    parent: Mapped["AbstractNode | None"] = relationship(remote_side=[id], foreign_keys=[parent_id])
+    parent: Mapped["AbstractNode | None"] = relationship(
+        remote_side=[id], foreign_keys=[parent_id], lazy=RELATIONSHIP_LAZY
+    )
     impls: Mapped[list["ImplNode"]] = relationship(
-        back_populates="abstract", cascade="all, delete-orphan"
+        back_populates="abstract", cascade="all, delete-orphan", passive_deletes=True, lazy=RELATIONSHIP_LAZY
     )
 
     kind: Mapped[AbstractNodeKind] = mapped_column(
@@ -92,13 +123,21 @@ class AbstractNode(Base):
 class ImplNode(Base):
     __tablename__ = "impl_nodes"
     __table_args__ = (
-        UniqueConstraint("abstract_id", "variant_key", name="uq_impl_abstract_variant"),
+        # INCLUDE id: the graph reads get (abstract_id, variant_key, id) index-only
+        UniqueConstraint("abstract_id", "variant_key", name="uq_impl_abstract_variant", postgresql_include=["id"]),
+        Index(
+            "ix_impl_nodes_abstract_core",
+            "abstract_id",
+            unique=True,
+            postgresql_where=text("variant_key = 'core'"),
+        ),
     )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
 
+    # indexed via uq_impl_abstract_variant (leading column)
     abstract_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("abstract_nodes.id", ondelete="CASCADE"), index=True
+        UUID(as_uuid=True), ForeignKey("abstract_nodes.id", ondelete="CASCADE")
     )
 
     # e.g. "core", "math", "signals", "physics"
@@ -107,48 +146,93 @@ class ImplNode(Base):
     # optional: the "learning contract" text
     contract_md: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
-    abstract: Mapped["AbstractNode"] = relationship(back_populates="impls")
+    abstract: Mapped["AbstractNode"] = relationship(back_populates="impls", lazy=RELATIONSHIP_LAZY)
 
     outgoing: Mapped[list["Edge"]] = relationship(
-        back_populates="src", foreign_keys="Edge.src_impl_id", cascade="all, delete-orphan"
+        back_populates="src",
+        foreign_keys="Edge.src_impl_id",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy=RELATIONSHIP_LAZY,
     )
     incoming: Mapped[list["Edge"]] = relationship(
-        back_populates="dst", foreign_keys="Edge.dst_impl_id", cascade="all, delete-orphan"
+        back_populates="dst",
+        foreign_keys="Edge.dst_impl_id",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy=RELATIONSHIP_LAZY,
     )
 
 class EdgeType(str, enum.Enum):
     requires = "requires"
     recommended = "recommended"
 
+
+# stored codes for edges.type; append only, never renumber (see migration 94ac69e3156a)
+EDGE_TYPE_CODES: dict[EdgeType, int] = {
+    EdgeType.requires: 0,
+    EdgeType.recommended: 1,
+}
+# codes are dense from 0, so decoding is a tuple index
+_EDGE_TYPE_BY_CODE: tuple[EdgeType, ...] = tuple(sorted(EDGE_TYPE_CODES, key=EDGE_TYPE_CODES.__getitem__))
+
+
+class EdgeTypeCode(TypeDecorator):
+    """EdgeType in Python, SMALLINT in the database."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # str enum: "requires" and EdgeType.requires hash alike, no EdgeType() per row
+        return EDGE_TYPE_CODES[value]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return _EDGE_TYPE_BY_CODE[value]
+
 class Edge(Base):
     __tablename__ = "edges"
     __table_args__ = (
         UniqueConstraint("src_impl_id", "dst_impl_id", "type", name="uq_edge_src_dst_type"),
+        # covering: focus edge lookups from either endpoint are index-only
+        Index("ix_edges_src_type_rank", "src_impl_id", "type", "rank", postgresql_include=["id", "dst_impl_id"]),
+        Index("ix_edges_dst_type", "dst_impl_id", "type", postgresql_include=["id", "src_impl_id", "rank"]),
+        CheckConstraint("type BETWEEN 0 AND 1", name="ck_edge_type_code"),
     )
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
 
+    # src/dst indexed via ix_edges_src_type_rank / ix_edges_dst_type (leading column)
     src_impl_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("impl_nodes.id", ondelete="CASCADE"), index=True
+        UUID(as_uuid=True), ForeignKey("impl_nodes.id", ondelete="CASCADE")
     )
     dst_impl_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("impl_nodes.id", ondelete="CASCADE"), index=True
+        UUID(as_uuid=True), ForeignKey("impl_nodes.id", ondelete="CASCADE")
     )
 
-    type: Mapped[EdgeType] = mapped_column(Enum(EdgeType, name="edge_type"))
+    type: Mapped[EdgeType] = mapped_column(EdgeTypeCode())
     rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
-    src: Mapped["ImplNode"] = relationship(back_populates="outgoing", foreign_keys=[src_impl_id])
-    dst: Mapped["ImplNode"] = relationship(back_populates="incoming", foreign_keys=[dst_impl_id])
+    src: Mapped["ImplNode"] = relationship(
+        back_populates="outgoing", foreign_keys=[src_impl_id], lazy=RELATIONSHIP_LAZY
+    )
+    dst: Mapped["ImplNode"] = relationship(
+        back_populates="incoming", foreign_keys=[dst_impl_id], lazy=RELATIONSHIP_LAZY
+    )
 
 
 class RelatedEdge(Base):
     __tablename__ = "related_edges"
     __table_args__ = (
-        UniqueConstraint("a_id", "b_id", name="uq_related_pair"),
         CheckConstraint("a_id < b_id", name="ck_related_canonical_order"),
     )
 
@@ -157,18 +241,124 @@ class RelatedEdge(Base):
         UUID(as_uuid=True), ForeignKey("abstract_nodes.id", ondelete="CASCADE"), primary_key=True
     )
     b_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("abstract_nodes.id", ondelete="CASCADE"), primary_key=True
+        UUID(as_uuid=True), ForeignKey("abstract_nodes.id", ondelete="CASCADE"), primary_key=True, index=True
     )
 
+    @staticmethod
+    def canonical_ids(x: uuid.UUID, y: uuid.UUID) -> tuple[uuid.UUID, uuid.UUID]:
+        """(a_id, b_id) for the pair {x, y}; UUID order matches Postgres uuid comparison."""
+        return (x, y) if x < y else (y, x)
+
 class ImplContext(Base):
     __tablename__ = "impl_contexts"
+    __table_args__ = (
+        Index("ix_impl_contexts_context", "context_abstract_id"),
+    )
 
     impl_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
         ForeignKey("impl_nodes.id", ondelete="CASCADE"),
         primary_key=True,
     )
 
     context_abstract_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
         ForeignKey("abstract_nodes.id", ondelete="CASCADE"),
         primary_key=True,
     )
+
+
+class AbstractAncestor(Base):
+    """
+    Transitive closure of AbstractNode.parent_id: one row per (node, ancestor),
+    including (node, node) at depth 0. Maintained by triggers on abstract_nodes
+    (see ABSTRACT_ANCESTORS_DDL), never written by the app.
+    """
+    __tablename__ = "abstract_ancestors"
+    __table_args__ = (
+        Index("ix_abstract_ancestors_ancestor_id", "ancestor_id"),
+    )
+
+    descendant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("abstract_nodes.id", ondelete="CASCADE"), primary_key=True
+    )
+    ancestor_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("abstract_nodes.id", ondelete="CASCADE"), primary_key=True
+    )
+    depth: Mapped[int] = mapped_column(Integer)
+
+
+# Statement-level triggers (with transition tables) so multi-row inserts work
+# regardless of parent/child row order. Keep in sync with migrations
+# 8a5e71e099af and f7e8ca92e75c.
+ABSTRACT_ANCESTORS_DDL = [
+    """
+    CREATE FUNCTION abstract_ancestors_rebuild(ids uuid[]) RETURNS void
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        looped uuid;
+    BEGIN
+        DELETE FROM abstract_ancestors WHERE descendant_id = ANY(ids);
+        -- CYCLE stops the walk at a repeated ancestor, so a parent_id loop
+        -- fails the statement instead of recursing forever
+        WITH RECURSIVE chain(descendant_id, ancestor_id, depth) AS (
+            SELECT id, id, 0 FROM abstract_nodes WHERE id = ANY(ids)
+            UNION ALL
+            SELECT c.descendant_id, n.parent_id, c.depth + 1
+            FROM chain c
+            JOIN abstract_nodes n ON n.id = c.ancestor_id
+            WHERE n.parent_id IS NOT NULL
+        ) CYCLE ancestor_id SET is_cycle USING path,
+        inserted AS (
+            INSERT INTO abstract_ancestors (descendant_id, ancestor_id, depth)
+            SELECT descendant_id, ancestor_id, depth FROM chain WHERE NOT is_cycle
+        )
+        SELECT descendant_id INTO looped FROM chain WHERE is_cycle LIMIT 1;
+        IF looped IS NOT NULL THEN
+            RAISE EXCEPTION 'abstract_nodes parent_id cycle through %', looped
+                USING ERRCODE = 'check_violation';
+        END IF;
+    END
+    $$
+    """,
+    """
+    CREATE FUNCTION abstract_ancestors_on_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM abstract_ancestors_rebuild(ARRAY(SELECT id FROM new_rows));
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE FUNCTION abstract_ancestors_on_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        -- every node under a re-parented one gets a new ancestor chain
+        PERFORM abstract_ancestors_rebuild(ARRAY(
+            SELECT DISTINCT aa.descendant_id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN abstract_ancestors aa ON aa.ancestor_id = n.id
+            WHERE o.parent_id IS DISTINCT FROM n.parent_id
+        ));
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER trg_abstract_ancestors_insert
+    AFTER INSERT ON abstract_nodes
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION abstract_ancestors_on_insert()
+    """,
+    """
+    CREATE TRIGGER trg_abstract_ancestors_update
+    AFTER UPDATE ON abstract_nodes
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION abstract_ancestors_on_update()
+    """,
+]
+
+for _stmt in ABSTRACT_ANCESTORS_DDL:
+    event.listen(AbstractAncestor.__table__, "after_create", DDL(_stmt))
@@ -1,26 +1,37 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_session
 from ..schemas import GraphOut
-from ..services.graph_focus import build_focus_graph
-from ..services.graph import build_graph
+from ..services.graph_focus import build_focus_graph_json
+from ..services.graph import build_graph_json
 
 
 router = APIRouter(prefix="/api/graph", tags=["graph"])
 
 
-@router.get("/", response_model=GraphOut)
+# Handlers return pre-serialized bytes; GraphOut only documents the 200 body.
+_GRAPH_RESPONSES = {200: {"model": GraphOut}}
+
+
+@router.get("/", response_model=None, responses=_GRAPH_RESPONSES)
 async def get_graph(
+    request: Request,
     session: AsyncSession = Depends(get_session),
 ):
-    return await build_graph(session=session)
+    body, etag = await build_graph_json(session=session)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
-@router.get("/focus/{abstract_id}", response_model=GraphOut)
+@router.get("/focus/{abstract_id}", response_model=None, responses=_GRAPH_RESPONSES)
 async def get_graph_focus(
     abstract_id: UUID,
     session: AsyncSession = Depends(get_session),
 ):
-    return await build_focus_graph(session=session, focus_abstract_id=abstract_id)
+    # cached per graph version
+    body = await build_focus_graph_json(session=session, focus_abstract_id=abstract_id)
+    return Response(content=body, media_type="application/json")
@@ -1,11 +1,30 @@
 from __future__ import annotations
 
 from uuid import UUID
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import Literal, Optional
 
 
-class AbstractNodeOut(BaseModel):
+# EdgeType values; enum member values are single shared str objects, so outputs
+# pass edge_type.value around without allocating
+EdgeTypeName = Literal["requires", "recommended"]
+
+
+class _OutModel(BaseModel):
+    # output models are built from our own rows and never mutated afterwards
+    model_config = ConfigDict(frozen=True)
+
+
+# Defined before the models that nest them, so every schema is complete at class
+# creation (no deferred forward-ref rebuild on first use).
+class ImplOut(_OutModel):
+    id: UUID
+    abstract_id: UUID
+    variant_key: str
+    contract_md: Optional[str] = None
+
+
+class AbstractNodeOut(_OutModel):
     id: UUID
     slug: str
     title: str
@@ -22,34 +41,28 @@ class AbstractNodeOut(BaseModel):
     default_impl_id: Optional[UUID] = None
     impls: list[ImplOut] = []
 
-class ImplOut(BaseModel):
-    id: UUID
-    abstract_id: UUID
-    variant_key: str
-    contract_md: Optional[str] = None
-
-class EdgeOut(BaseModel):
+class EdgeOut(_OutModel):
     id: UUID
     src_impl_id: UUID
     dst_impl_id: UUID
-    type: str
+    type: EdgeTypeName
     rank: int | None = None
 
 
-class RelatedEdgeOut(BaseModel):
+class RelatedEdgeOut(_OutModel):
     a_id: UUID
     b_id: UUID
 
 
-class BoundaryHintOut(BaseModel):
+class BoundaryHintOut(_OutModel):
     group_id: UUID
     title: str
     short_title: str
-    type: str
+    type: EdgeTypeName
     count: int
 
 
-class GraphOut(BaseModel):
+class GraphOut(_OutModel):
     abstract_nodes: list[AbstractNodeOut]
     impl_nodes: list[ImplOut]
     edges: list[EdgeOut]
@@ -57,6 +70,10 @@ class GraphOut(BaseModel):
     boundary_hints: list[BoundaryHintOut]
 
 
+# built once; dump_json() goes straight to bytes with pydantic-core
+GRAPH_OUT_ADAPTER = TypeAdapter(GraphOut)
+
+
 class NodeCreateIn(BaseModel):
     slug: str = Field(min_length=1, max_length=120)
     title: str = Field(min_length=1, max_length=200)
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-from sqlalchemy import delete
+import json
+import sys
+import uuid
+from dataclasses import dataclass
+from importlib.resources import files
+
+from sqlalchemy import Table, insert, literal, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import (
@@ -11,156 +17,174 @@ from .models import (
     RelatedEdge,
     EdgeType,
     AbstractNodeKind,
+    uuid7,
 )
-from .logic.graph import would_create_cycle
+from .logic.graph import RequiresIndex
+from .services.graph import invalidate_graph_cache, notify_graph_changed
+
+
+# Below this many rows a plain multi-row INSERT is cheaper: asyncpg's COPY
+# waits for the server's CopyInResponse before streaming, so it costs an extra
+# round trip that only pays off once there is real volume to move.
+_COPY_MIN_ROWS = 200
+
+
+async def _load_rows(session: AsyncSession, table: Table, rows: list[dict]) -> None:
+    if len(rows) < _COPY_MIN_ROWS:
+        await session.execute(insert(table), rows)
+        return
+
+    # COPY over asyncpg's binary protocol: no SQL to parse per row. Values still
+    # go through each column's bind processing (enum names, EdgeType -> SMALLINT
+    # code); omitted columns get their server defaults and the statement-level
+    # triggers fire as for INSERT.
+    conn = await session.connection()
+    dialect = conn.dialect
+    columns = list(rows[0])
+    procs = [table.c[c].type.dialect_impl(dialect).bind_processor(dialect) for c in columns]
+    records = [
+        tuple(p(row[c]) if p else row[c] for c, p in zip(columns, procs))
+        for row in rows
+    ]
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
 
 
-async def seed_minimal(session: AsyncSession) -> None:
-    # wipe (MVP convenience)
-    # order matters due to FKs
-    await session.execute(delete(RelatedEdge))
-    await session.execute(delete(Edge))
-    await session.execute(delete(ImplNode))
-    await session.execute(delete(AbstractNode))
-    await session.commit()
+@dataclass(frozen=True, slots=True)
+class SeedSpec:
+    """
+    Declarative seed graph, keyed by slug so it can be written (and diffed) as
+    data (app/seed_data.json). Impls are referenced as [abstract slug, variant_key].
+
+    abstract_nodes: slug, title, short_title, optional kind / parent / summary / body_md
+                    (parents listed before their children)
+    impl_nodes:     abstract, optional variant_key (default "core") / contract_md / context
+    requires:       [src impl ref, dst impl ref]
+    recommended:    [src impl ref, dst impl ref, rank]
+    related:        [slug, slug]
+    """
+
+    abstract_nodes: list[dict]
+    impl_nodes: list[dict]
+    requires: list[list]
+    recommended: list[list]
+    related: list[list]
+
+    @classmethod
+    def load(cls, resource: str) -> SeedSpec:
+        """Parse a JSON spec shipped next to this module (one C-level json.loads)."""
+        return cls(**json.loads(files(__package__).joinpath(resource).read_bytes()))
+
+
+# Toy graph: three groups; Math children, plus a Fourier concept whose variants
+# have no core on purpose (forces the UI's variant picker), each variant scoped
+# to its context group.
+SPEC_MINIMAL = SeedSpec.load("seed_data.json")
 
-    def a(
-        slug: str,
-        title: str,
-        short_title: str,
-        *,
-        kind: AbstractNodeKind = AbstractNodeKind.concept,
-        parent: AbstractNode | None = None,
-        summary: str = "",
-        body_md: str | None = None,
-    ) -> AbstractNode:
-        return AbstractNode(
-            slug=slug,
-            title=title,
-            short_title=short_title,
-            summary=summary or None,
-            body_md=body_md,
-            kind=kind,
-            parent_id=parent.id if parent else None,
-        )
 
-    def impl(
-        abstract: AbstractNode,
-        variant_key: str = "core",
-        contract_md: str | None = None,
-    ) -> ImplNode:
-        return ImplNode(
-            abstract_id=abstract.id,
-            variant_key=variant_key,
-            contract_md=contract_md,
+_WIPE = text(
+    "TRUNCATE TABLE related_edges, edges, impl_contexts, impl_nodes, "
+    "abstract_ancestors, abstract_nodes CASCADE"
+)
+
+
+async def _graph_is_empty(session: AsyncSession) -> bool:
+    # every other seeded table hangs off abstract_nodes by FK, so this one row
+    # probe answers for all of them
+    return (await session.execute(select(literal(1)).select_from(AbstractNode).limit(1))).first() is None
+
+
+async def seed_from_spec(session: AsyncSession, spec: SeedSpec) -> None:
+    # re-creatable bulk load: don't wait for the WAL flush at commit. LOCAL
+    # scopes it to the seed transaction; a crash can only lose the seed itself
+    await session.execute(text("SET LOCAL synchronous_commit = off"))
+
+    # wipe (MVP convenience): one TRUNCATE instead of a DELETE per table; it is
+    # part of the seed transaction, so readers wait for the commit rather than
+    # ever seeing an empty graph. A fresh DB skips it (new relation files +
+    # ACCESS EXCLUSIVE locks) altogether.
+    if not await _graph_is_empty(session):
+        await session.execute(_WIPE)
+
+    # Rows are plain dicts with ids assigned here, so foreign keys are known up
+    # front and every table goes in with a single statement (no ORM unit of
+    # work, no flushes). A bad slug reference fails with a KeyError naming it.
+    abs_id: dict[str, uuid.UUID] = {}
+    abstract_rows = []
+    for n in spec.abstract_nodes:
+        abs_id[n["slug"]] = uuid7()
+        abstract_rows.append(
+            dict(
+                id=abs_id[n["slug"]],
+                slug=n["slug"],
+                title=n["title"],
+                short_title=n["short_title"],
+                summary=n.get("summary") or None,
+                body_md=n.get("body_md"),
+                kind=AbstractNodeKind(n.get("kind", "concept")),
+                parent_id=abs_id[n["parent"]] if n.get("parent") else None,
+            )
         )
 
-    # -------------------------
-    # Hierarchy (abstract nodes)
-    # -------------------------
-    math = a("math", "Math", "Math", kind=AbstractNodeKind.group, summary="Mathematical foundations.")
-    physics = a("physics", "Physics", "Phys", kind=AbstractNodeKind.group, summary="Physics concepts.")
-    dsp_group = a("signals", "Signal Processing", "DSP", kind=AbstractNodeKind.group, summary="DSP domain.")
-
-    session.add_all([math, physics, dsp_group])
-    await session.flush()  # IDs for parent_id
-
-    # Math children (expandable super-node)
-    logic = a("logic", "Logic", "Logic", parent=math, summary="Propositional + predicate logic basics.")
-    lin_alg = a("lin-alg", "Linear Algebra", "LinAlg", parent=math, summary="Vector spaces, matrices.")
-    calc = a("calc", "Calculus", "Calc", parent=math, summary="Limits, derivatives, integrals.")
-
-    # Fourier: concept with variants (NOT a container)
-    fourier = a(
-        "fourier-transform",
-        "Fourier Transform",
-        "Fourier",
-        parent=math,
-        summary="Frequency-domain representations; multiple formulations.",
-    )
-
-    # DSP / Physics children
-    s_and_s = a(
-        "signals-and-systems",
-        "Signals & Systems",
-        "S&S",
-        parent=dsp_group,
-        summary="LTI systems, convolution, frequency response.",
-    )
-    qm = a(
-        "quantum-mechanics",
-        "Quantum Mechanics",
-        "QM",
-        parent=physics,
-        summary="Intro QM foundations and tools.",
-    )
-
-    session.add_all([logic, lin_alg, calc, fourier, s_and_s, qm])
-    await session.flush()
-
-    # -------------------------
-    # Impl nodes (DAG lives here)
-    # -------------------------
-    # core impls for normal concepts
-    logic_core = impl(logic, "core")
-    la_core = impl(lin_alg, "core")
-    calc_core = impl(calc, "core")
-    ss_core = impl(s_and_s, "core")
-    qm_core = impl(qm, "core")
-
-    # Fourier variants (no core on purpose, to force UI to show variant picker)
-    ft_math = impl(fourier, "math")
-    ft_signals = impl(fourier, "signals")
-    ft_physics = impl(fourier, "physics")
-
-    session.add_all(
-        [logic_core, la_core, calc_core, ss_core, qm_core, ft_math, ft_signals, ft_physics]
-    )
-    await session.flush()
-
-    session.add_all(
-        [
-            ImplContext(impl_id=ft_math.id, context_abstract_id=math.id),
-            ImplContext(impl_id=ft_signals.id, context_abstract_id=dsp_group.id),
-            ImplContext(impl_id=ft_physics.id, context_abstract_id=physics.id),
-        ]
-    )
-    await session.flush()
-
-    # -------------------------
-    # Edges (impl -> impl)
-    # -------------------------
-    # requires edges, cycle-checked
-    requires_pairs = [
-        (logic_core.id, la_core.id),     # Logic -> Linear Algebra (toy example)
-        (la_core.id, calc_core.id),      # Linear Algebra -> Calculus (toy example)
-        (ss_core.id, ft_signals.id),     # Signals & Systems -> Fourier (signals)
-        (qm_core.id, ft_physics.id),     # Quantum Mechanics -> Fourier (physics)
-        (ft_math.id, ft_signals.id),     # optional: math formulation supports signals formulation
+    impl_id: dict[tuple[str, str], uuid.UUID] = {}
+    impl_rows = []
+    context_rows = []
+    for i in spec.impl_nodes:
+        # json.loads makes a new str per occurrence; share one per variant name
+        variant_key = sys.intern(i.get("variant_key", "core"))
+        iid = impl_id[i["abstract"], variant_key] = uuid7()
+        impl_rows.append(
+            dict(id=iid, abstract_id=abs_id[i["abstract"]], variant_key=variant_key, contract_md=i.get("contract_md"))
+        )
+        if i.get("context"):
+            context_rows.append(dict(impl_id=iid, context_abstract_id=abs_id[i["context"]]))
+
+    requires_pairs = [(impl_id[tuple(src)], impl_id[tuple(dst)]) for src, dst in spec.requires]
+    # incremental check: edges that follow the maintained topological order are
+    # accepted in O(1), and a bad edge is reported by its own slugs
+    index = RequiresIndex()
+    for (src, dst), (src_ref, dst_ref) in zip(requires_pairs, spec.requires):
+        try:
+            index.add(src, dst)
+        except ValueError:
+            raise RuntimeError(f"Seed would create cycle: {src_ref} -> {dst_ref}") from None
+
+    edge_rows = [
+        dict(id=uuid7(), src_impl_id=src, dst_impl_id=dst, type=EdgeType.requires, rank=None)
+        for src, dst in requires_pairs
+    ]
+    edge_rows += [
+        dict(
+            id=uuid7(),
+            src_impl_id=impl_id[tuple(src)],
+            dst_impl_id=impl_id[tuple(dst)],
+            type=EdgeType.recommended,
+            rank=rank,
+        )
+        for src, dst, rank in spec.recommended
     ]
 
-    existing: list[tuple] = []
-    for src, dst in requires_pairs:
-        if would_create_cycle(existing, (src, dst)):
-            raise RuntimeError(f"Seed would create cycle: {src} -> {dst}")
-        session.add(Edge(src_impl_id=src, dst_impl_id=dst, type=EdgeType.requires, rank=None))
-        existing.append((src, dst))
-
-    # recommended edges (ordered)
-    session.add_all(
-        [
-            Edge(src_impl_id=calc_core.id, dst_impl_id=ft_math.id, type=EdgeType.recommended, rank=1),
-            Edge(src_impl_id=la_core.id, dst_impl_id=ft_math.id, type=EdgeType.recommended, rank=2),
-        ]
-    )
-
-    # -------------------------
-    # Related edges (abstract <-> abstract)
-    # -------------------------
-    a_id = logic.id
-    b_id = lin_alg.id
-    if a_id > b_id:
-        a_id, b_id = b_id, a_id
-    session.add(RelatedEdge(a_id=a_id, b_id=b_id))
+    related_rows = [
+        dict(zip(("a_id", "b_id"), RelatedEdge.canonical_ids(abs_id[x], abs_id[y])))
+        for x, y in spec.related
+    ]
 
+    # tables in FK order; parents and children share one statement since FK checks
+    # run at statement end
+    for table, rows in (
+        (AbstractNode.__table__, abstract_rows),
+        (ImplNode.__table__, impl_rows),
+        (ImplContext.__table__, context_rows),
+        (Edge.__table__, edge_rows),
+        (RelatedEdge.__table__, related_rows),
+    ):
+        if rows:
+            await _load_rows(session, table, rows)
+
+    await notify_graph_changed(session)
     await session.commit()
+    invalidate_graph_cache()
+
+
+async def seed_minimal(session: AsyncSession) -> None:
+    await seed_from_spec(session, SPEC_MINIMAL)
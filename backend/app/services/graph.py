@@ -1,93 +1,242 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+from collections import defaultdict
 from uuid import UUID
-from sqlalchemy import select, func
+from sqlalchemy import case, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from ..db import export_snapshot, get_engine, session_scope, stream_all
 from ..models import AbstractNode, ImplNode, Edge, RelatedEdge
-from ..schemas import GraphOut, AbstractNodeOut, ImplOut, EdgeOut, RelatedEdgeOut
+from ..schemas import GRAPH_OUT_ADAPTER, GraphOut, AbstractNodeOut, ImplOut, EdgeOut, RelatedEdgeOut
 
+log = logging.getLogger("graph")
 
-async def build_graph(session: AsyncSession):
-    # counts for has_children
-    children_cte = (
-        select(AbstractNode.parent_id.label("id"), func.count().label("child_count"))
-        .where(AbstractNode.parent_id.isnot(None))
-        .group_by(AbstractNode.parent_id)
-        .cte("children_cte")
-    )
 
-    # counts for has_variants
-    variants_cte = (
-        select(ImplNode.abstract_id.label("id"), func.count().label("impl_count"))
-        .group_by(ImplNode.abstract_id)
-        .cte("variants_cte")
-    )
+# The /api/graph statements are fixed, so build them once at import instead of
+# re-assembling the Core trees per request (their compiled SQL is then a plain
+# cache hit in SQLAlchemy's compiled cache).
 
-    q_abs = (
-        select(
-            AbstractNode,
-            func.coalesce(children_cte.c.child_count, 0).label("child_count"),
-            func.coalesce(variants_cte.c.impl_count, 0).label("impl_count"),
+# counts for has_children
+_children_cte = (
+    select(AbstractNode.parent_id.label("id"), func.count().label("child_count"))
+    .where(AbstractNode.parent_id.isnot(None))
+    .group_by(AbstractNode.parent_id)
+    .cte("children_cte")
+)
+
+# one pass over impl_nodes: impl count (has_variants) and the default impl,
+# "core" if present, else the first variant_key
+_impl_stats_cte = (
+    select(
+        ImplNode.abstract_id.label("id"),
+        ImplNode.id.label("default_impl_id"),
+        func.count().over(partition_by=ImplNode.abstract_id).label("impl_count"),
+        func.row_number()
+        .over(
+            partition_by=ImplNode.abstract_id,
+            # COLLATE "C": codepoint order, as Python's sorted() gave, whatever the DB locale
+            order_by=(case((ImplNode.variant_key == "core", 0), else_=1), ImplNode.variant_key.collate("C")),
         )
-        .outerjoin(children_cte, children_cte.c.id == AbstractNode.id)
-        .outerjoin(variants_cte, variants_cte.c.id == AbstractNode.id)
-        .options(selectinload(AbstractNode.impls))  # load impl list per abstract
+        .label("rn"),
+    )
+    .cte("impl_stats_cte")
+)
+
+_Q_ABS = (
+    select(
+        AbstractNode.id,
+        AbstractNode.slug,
+        AbstractNode.title,
+        AbstractNode.short_title,
+        AbstractNode.summary,
+        AbstractNode.body_md,
+        AbstractNode.kind,
+        AbstractNode.parent_id,
+        func.coalesce(_children_cte.c.child_count, 0).label("child_count"),
+        func.coalesce(_impl_stats_cte.c.impl_count, 0).label("impl_count"),
+        _impl_stats_cte.c.default_impl_id,
     )
+    .outerjoin(_children_cte, _children_cte.c.id == AbstractNode.id)
+    .outerjoin(_impl_stats_cte, (_impl_stats_cte.c.id == AbstractNode.id) & (_impl_stats_cte.c.rn == 1))
+)
+
+_Q_IMPLS = select(ImplNode.id, ImplNode.abstract_id, ImplNode.variant_key, ImplNode.contract_md)
+_Q_EDGES = select(Edge.id, Edge.src_impl_id, Edge.dst_impl_id, Edge.type, Edge.rank)
+_Q_RELATED = select(RelatedEdge.a_id, RelatedEdge.b_id)
+
+
+async def build_graph(session: AsyncSession):
+    # Column-only selects (plain tuples, no ORM identity map), and outputs built
+    # with model_construct: the data comes straight from our own schema.
+
+    # bound constructors: these loops run once per row of the whole graph
+    new_impl = ImplOut.model_construct
+    new_abs = AbstractNodeOut.model_construct
+    new_edge = EdgeOut.model_construct
+    new_related = RelatedEdgeOut.model_construct
 
-    abs_rows = (await session.execute(q_abs)).all()
-
-    impls = (await session.execute(select(ImplNode))).scalars().all()
-    edges = (await session.execute(select(Edge))).scalars().all()
-    related = (await session.execute(select(RelatedEdge))).scalars().all()
-
-    def pick_default_impl_id(impl_list: list[ImplNode]) -> UUID | None:
-        if not impl_list:
-            return None
-        core = next((x for x in impl_list if x.variant_key == "core"), None)
-        if core:
-            return core.id
-        return sorted(impl_list, key=lambda x: x.variant_key)[0].id
-
-    abs_out: list[AbstractNodeOut] = []
-    for a, child_count, impl_count in abs_rows:
-        impl_list = list(a.impls or [])
-        abs_out.append(
-            AbstractNodeOut(
-                id=a.id,
-                slug=a.slug,
-                title=a.title,
-                short_title=a.short_title,
-                summary=a.summary,
-                body_md=a.body_md,
-                kind=a.kind.value if hasattr(a.kind, "value") else str(a.kind),
-                parent_id=a.parent_id,
-                has_children=child_count > 0,
-                has_variants=impl_count > 1,
-                default_impl_id=pick_default_impl_id(impl_list),
-                impls=[
-                    ImplOut(
-                        id=i.id,
-                        abstract_id=i.abstract_id,
-                        variant_key=i.variant_key,
-                        contract_md=i.contract_md,
-                    )
-                    for i in impl_list
-                ],
+    # one ImplOut per impl, shared by impl_nodes and the owning abstract's impls
+    impls_out: list[ImplOut] = []
+    impls_by_abs: defaultdict[UUID, list[ImplOut]] = defaultdict(list)
+    edges_out: list[EdgeOut] = []
+    related_out: list[RelatedEdgeOut] = []
+
+    # all four reads see one snapshot: the helper sessions import the request
+    # session's, so a write committing mid-build can't mix old and new rows
+    snapshot = await export_snapshot(session)
+
+    async def fetch_abs():
+        return (await session.execute(_Q_ABS)).all()
+
+    # the big row sets are streamed and turned into output as they arrive
+    async def load_impls() -> None:
+        async for impl_id, abstract_id, variant_key, contract_md in stream_all(_Q_IMPLS, snapshot=snapshot):
+            i = new_impl(
+                id=impl_id,
+                abstract_id=abstract_id,
+                variant_key=variant_key,
+                contract_md=contract_md,
+            )
+            impls_out.append(i)
+            impls_by_abs[abstract_id].append(i)
+
+    async def load_edges() -> None:
+        async for edge_id, src, dst, edge_type, rank in stream_all(_Q_EDGES, snapshot=snapshot):
+            edges_out.append(
+                new_edge(id=edge_id, src_impl_id=src, dst_impl_id=dst, type=edge_type.value, rank=rank)
             )
+
+    async def load_related() -> None:
+        async for a_id, b_id in stream_all(_Q_RELATED, snapshot=snapshot):
+            related_out.append(new_related(a_id=a_id, b_id=b_id))
+
+    # independent reads: wall time ~ slowest query instead of the sum
+    abs_rows, *_ = await asyncio.gather(fetch_abs(), load_impls(), load_edges(), load_related())
+
+    abs_out = [
+        new_abs(
+            id=a.id,
+            slug=a.slug,
+            title=a.title,
+            short_title=a.short_title,
+            summary=a.summary,
+            body_md=a.body_md,
+            kind=a.kind,  # the PG enum column reads back as its plain label str
+            parent_id=a.parent_id,
+            has_children=a.child_count > 0,
+            has_variants=a.impl_count > 1,
+            default_impl_id=a.default_impl_id,
+            impls=impls_by_abs.get(a.id, []),
         )
+        for a in abs_rows
+    ]
 
-    return GraphOut(
+    return GraphOut.model_construct(
         abstract_nodes=abs_out,
-        impl_nodes=[
-            ImplOut(id=i.id, abstract_id=i.abstract_id, variant_key=i.variant_key, contract_md=i.contract_md)
-            for i in impls
-        ],
-        edges=[
-            EdgeOut(id=e.id, src_impl_id=e.src_impl_id, dst_impl_id=e.dst_impl_id, type=e.type.value, rank=e.rank)
-            for e in edges
-        ],
-        related_edges=[RelatedEdgeOut(a_id=r.a_id, b_id=r.b_id) for r in related],
+        impl_nodes=impls_out,
+        edges=edges_out,
+        related_edges=related_out,
         boundary_hints=[],
     )
+
+
+# ----------------------------
+# Serialized payload cache
+# ----------------------------
+
+# The full graph only changes on writes (seed for now), so keep the serialized
+# /api/graph body around until a writer calls invalidate_graph_cache().
+_graph_json: tuple[bytes, str] | None = None
+_graph_json_generation = 0
+_graph_json_lock = asyncio.Lock()
+
+
+def graph_version() -> int:
+    """Bumped by every invalidate_graph_cache(); key for caches derived from the graph."""
+    return _graph_json_generation
+
+
+def invalidate_graph_cache() -> None:
+    global _graph_json, _graph_json_generation
+    _graph_json = None
+    _graph_json_generation += 1
+
+
+async def build_graph_json(session: AsyncSession) -> tuple[bytes, str]:
+    """JSON body of build_graph() and its ETag, cached until invalidate_graph_cache()."""
+    global _graph_json
+    cached = _graph_json
+    if cached is not None:
+        return cached
+
+    async with _graph_json_lock:
+        if _graph_json is not None:
+            return _graph_json
+
+        generation = _graph_json_generation
+        body = GRAPH_OUT_ADAPTER.dump_json(await build_graph(session))
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        # don't publish a payload a write raced with
+        if generation == _graph_json_generation:
+            _graph_json = (body, etag)
+        return body, etag
+
+
+# ----------------------------
+# Change notifications
+# ----------------------------
+
+# Writers NOTIFY on this channel inside their transaction (delivered on commit);
+# every app process LISTENs and rebuilds its snapshot, so /api/graph stays
+# query-free between writes even with several workers.
+GRAPH_CHANGED_CHANNEL = "graph_changed"
+
+
+async def notify_graph_changed(session: AsyncSession) -> None:
+    await session.execute(select(func.pg_notify(GRAPH_CHANGED_CHANNEL, "")))
+
+
+async def _rebuild_graph_cache() -> None:
+    invalidate_graph_cache()
+    async with session_scope() as session:
+        await build_graph_json(session)
+
+
+async def watch_graph_changes(*, debounce: float = 0.25, reconnect_delay: float = 5.0) -> None:
+    """
+    LISTEN on GRAPH_CHANGED_CHANNEL and rebuild the serialized graph after each
+    burst of notifications. Holds one pooled connection; reconnects on failure.
+    Runs until cancelled (see the app lifespan).
+    """
+    while True:
+        try:
+            async with get_engine().connect() as conn:
+                raw = (await conn.get_raw_connection()).driver_connection
+                changed = asyncio.Event()
+
+                def on_notify(*_args) -> None:
+                    changed.set()
+
+                await raw.add_listener(GRAPH_CHANGED_CHANNEL, on_notify)
+                try:
+                    # covers writes made while nobody was listening
+                    await _rebuild_graph_cache()
+                    while not raw.is_closed():
+                        try:
+                            await asyncio.wait_for(changed.wait(), timeout=reconnect_delay)
+                        except TimeoutError:
+                            continue
+                        await asyncio.sleep(debounce)  # coalesce bursts into one rebuild
+                        changed.clear()
+                        await _rebuild_graph_cache()
+                finally:
+                    if not raw.is_closed():
+                        await raw.remove_listener(GRAPH_CHANGED_CHANNEL, on_notify)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.warning("graph change listener failed; retrying in %ss", reconnect_delay, exc_info=True)
+            await asyncio.sleep(reconnect_delay)
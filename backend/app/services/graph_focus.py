@@ -1,19 +1,46 @@
 from __future__ import annotations
 
+import asyncio
+from collections import Counter, OrderedDict, defaultdict
 from dataclasses import dataclass
+from operator import attrgetter
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, Row, any_, bindparam, select, union_all
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
-from ..models import AbstractNode, ImplNode, ImplContext, Edge, EdgeType
-from ..schemas import GraphOut, AbstractNodeOut, ImplOut, EdgeOut, BoundaryHintOut
+from ..db import fetch_all
+from .graph import graph_version
+from ..models import AbstractAncestor, AbstractNode, ImplNode, ImplContext, Edge, EdgeType
+from ..schemas import GRAPH_OUT_ADAPTER, GraphOut, AbstractNodeOut, ImplOut, EdgeOut, BoundaryHintOut
 
 import logging
 
 log = logging.getLogger("graph.focus")
 
+# Edges are only read here: load plain rows (same attribute names as Edge)
+# instead of hydrating ORM objects.
+_EDGE_COLUMNS = (Edge.id, Edge.src_impl_id, Edge.dst_impl_id, Edge.type, Edge.rank)
+# same for impls: just the ImplOut fields
+_IMPL_COLUMNS = (ImplNode.id, ImplNode.abstract_id, ImplNode.variant_key, ImplNode.contract_md)
+
+# Everything the builder needs is loaded explicitly; a relationship lazy load
+# would be hidden IO on the async session, so make it raise instead.
+_NO_LAZY = raiseload("*")
+
+_UUID_ARRAY = ARRAY(PG_UUID(as_uuid=True))
+
+
+def _in_ids(col, ids) -> ColumnElement[bool]:
+    """
+    col = ANY($1::uuid[]) instead of IN ($1, ..., $n): one statement text (and one
+    asyncpg prepared statement) whatever the number of ids.
+    """
+    return col == any_(bindparam(None, list(ids), type_=_UUID_ARRAY))
+
 
 # ----------------------------
 # Public entry point
@@ -37,14 +64,14 @@ async def build_focus_graph(*, session: AsyncSession, focus_abstract_id: UUID) -
     """
 
     # ---------- 1) focus ----------
-    focus = await session.get(AbstractNode, focus_abstract_id)
+    focus = await session.get(AbstractNode, focus_abstract_id, options=[_NO_LAZY])
     if not focus:
         raise HTTPException(status_code=404, detail="Abstract node not found")
 
     # ---------- 2) inside abstracts = focus + direct children ----------
     children = (
         await session.execute(
-            select(AbstractNode).where(AbstractNode.parent_id == focus_abstract_id)
+            select(AbstractNode).options(_NO_LAZY).where(AbstractNode.parent_id == focus_abstract_id)
         )
     ).scalars().all()
 
@@ -68,16 +95,19 @@ async def build_focus_graph(*, session: AsyncSession, focus_abstract_id: UUID) -
         inside_abs_ids=inside_abs_ids,
         inside_impl_ids_active=state.inside_impl_ids_active,
         touching_edges_any_inside_impl=state.touching_edges_any_inside_impl,
-        impl_by_id=state.impl_by_id,
+        impl_to_abs=state.impl_to_abs,
         abs_by_id=state.abs_by_id,
     )
 
-    log.debug("EXPAND outgoing_concept_targets count=%s ids=%s",
-              len(extra_abs_ids), sorted(map(str, extra_abs_ids))[:20])
+    # the id listing is built on every call otherwise, even with DEBUG off;
+    # UUID.int orders like the hex string without formatting each id to sort
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("EXPAND outgoing_concept_targets count=%s ids=%s",
+                  len(extra_abs_ids), [str(i) for i in sorted(extra_abs_ids, key=attrgetter("int"))[:20]])
 
     if extra_abs_ids:
         extra_abs = (
-            await session.execute(select(AbstractNode).where(AbstractNode.id.in_(extra_abs_ids)))
+            await session.execute(select(AbstractNode).options(_NO_LAZY).where(_in_ids(AbstractNode.id, extra_abs_ids)))
         ).scalars().all()
 
         inside_abs.extend(extra_abs)
@@ -96,63 +126,69 @@ async def build_focus_graph(*, session: AsyncSession, focus_abstract_id: UUID) -
         )
 
     # ---------- 5) boundary grouping helpers ----------
-    focus_ancestor_ids = _build_ancestor_set(focus, state.abs_by_id)
+    focus_ancestor_ids = set(state.ancestors.get(focus.id, (focus.id,)))
+
+    # outside abstract id -> boundary group; every node on a walked chain below
+    # the group shares it, so one walk fills the cache for the whole path
+    boundary_group_cache: dict[UUID, AbstractNode] = {}
 
     def find_boundary_group(outside_abs: AbstractNode) -> AbstractNode:
         """
         "Topmost outside node before entering focus ancestor chain":
         Walk up outside_abs -> parent -> ... until next parent would be in focus_ancestor_ids, or root.
         """
-        cur = outside_abs
-        while True:
-            pid = cur.parent_id
-            if pid is None:
-                return cur
-            if pid in focus_ancestor_ids:
-                return cur
-            nxt = state.abs_by_id.get(pid)
-            if nxt is None:
-                return cur
-            cur = nxt
-
-    # ---------- 6) internal edges (ACTIVE-only) ----------
-    internal_edges: list[Edge] = []
+        cached = boundary_group_cache.get(outside_abs.id)
+        if cached is not None:
+            return cached
+
+        walked = [outside_abs.id]
+        for aid in state.ancestors.get(outside_abs.id, ())[1:]:
+            if aid in focus_ancestor_ids:
+                break
+            cached = boundary_group_cache.get(aid)
+            if cached is not None:
+                break
+            walked.append(aid)
+
+        group = cached if cached is not None else state.abs_by_id[walked[-1]]
+        for aid in walked:
+            boundary_group_cache[aid] = group
+        return group
+
+    # ---------- 6+7) one pass over touching edges ----------
+    # internal edges: both impls ACTIVE inside
+    # boundary hints: ANY inside-impl (including inactive variants), exactly one abstract inside
+    # hot loop: resolve impl -> abstract once, test membership on locals
+    impl_to_abs = state.impl_to_abs
+    inside = frozenset(inside_abs_ids)
+    active = state.inside_impl_ids_active
+    abs_get = state.abs_by_id.get
+    internal_edges: list[Row] = []
+    boundary_map: Counter[tuple[UUID, EdgeType]] = Counter()
+
     for e in state.touching_edges_any_inside_impl:
-        if e.src_impl_id in state.inside_impl_ids_active and e.dst_impl_id in state.inside_impl_ids_active:
+        if e.src_impl_id in active and e.dst_impl_id in active:
             internal_edges.append(e)
 
-    # ---------- 7) boundary hints (ANY inside-impl, including inactive variants) ----------
-    boundary_map: dict[tuple[UUID, EdgeType], int] = {}
-
-    for e in state.touching_edges_any_inside_impl:
-        src_impl = state.impl_by_id.get(e.src_impl_id)
-        dst_impl = state.impl_by_id.get(e.dst_impl_id)
-        if not src_impl or not dst_impl:
+        src_abs_id = impl_to_abs.get(e.src_impl_id)
+        dst_abs_id = impl_to_abs.get(e.dst_impl_id)
+        if src_abs_id is None or dst_abs_id is None:
             continue
 
-        src_abs_id = src_impl.abstract_id
-        dst_abs_id = dst_impl.abstract_id
-
-        src_abs_in = src_abs_id in inside_abs_ids
-        dst_abs_in = dst_abs_id in inside_abs_ids
-
-        # boundary edge = exactly one abstract is inside
-        if not (src_abs_in ^ dst_abs_in):
+        src_abs_in = src_abs_id in inside
+        if src_abs_in == (dst_abs_id in inside):
             continue
 
-        outside_abs_id = dst_abs_id if src_abs_in else src_abs_id
-        outside_abs = state.abs_by_id.get(outside_abs_id)
+        outside_abs = abs_get(dst_abs_id if src_abs_in else src_abs_id)
         if not outside_abs:
             continue
 
-        boundary_group = find_boundary_group(outside_abs)
-        key = (boundary_group.id, e.type)
-        boundary_map[key] = boundary_map.get(key, 0) + 1
+        boundary_map[find_boundary_group(outside_abs).id, e.type] += 1
 
     log.debug("BOUNDARY internal_edges=%s boundary_map_keys=%s", len(internal_edges), len(boundary_map))
 
     boundary_hints = [
-        BoundaryHintOut(
+        BoundaryHintOut.model_construct(
             group_id=gid,
             title=state.abs_by_id[gid].title,
             short_title=state.abs_by_id[gid].short_title,
@@ -163,23 +199,16 @@ async def build_focus_graph(*, session: AsyncSession, focus_abstract_id: UUID) -
     ]
 
     # ---------- 8) pack output ----------
+    # model_construct: every value comes from our own rows, no need to re-validate
     # abstract.impls should include ALL impl variants for that abstract (variant picker),
     # even if some variants are inactive in this focus.
-    abs_id_to_impls_all: dict[UUID, list[ImplNode]] = {}
-    for i in state.inside_impls_all:
-        abs_id_to_impls_all.setdefault(i.abstract_id, []).append(i)
-
-    def pick_default_impl_id(impls: list[ImplNode]) -> UUID | None:
-        if not impls:
-            return None
-        core = next((x for x in impls if x.variant_key == "core"), None)
-        return core.id if core else sorted(impls, key=lambda x: x.variant_key)[0].id
-
     abstract_nodes_out: list[AbstractNodeOut] = []
     for n in inside_abs:
-        impls = abs_id_to_impls_all.get(n.id, [])
+        # already in variant_key order; has_variants comes straight from the loaded variants
+        impls = state.impls_by_abs.get(n.id, [])
+        core = next((i for i in impls if i.variant_key == "core"), None)
         abstract_nodes_out.append(
-            AbstractNodeOut(
+            AbstractNodeOut.model_construct(
                 id=n.id,
                 slug=n.slug,
                 title=n.title,
@@ -190,24 +219,24 @@ async def build_focus_graph(*, session: AsyncSession, focus_abstract_id: UUID) -
                 parent_id=n.parent_id,
                 has_children=(n.id == focus_abstract_id and len(children) > 0),
                 has_variants=(len(impls) > 1),
-                default_impl_id=pick_default_impl_id(impls),
+                default_impl_id=(core or impls[0]).id if impls else None,
                 impls=[
-                    ImplOut(
+                    ImplOut.model_construct(
                         id=i.id,
                         abstract_id=i.abstract_id,
                         variant_key=i.variant_key,
                         contract_md=i.contract_md,
                     )
-                    for i in sorted(impls, key=lambda x: x.variant_key)
+                    for i in impls
                 ],
             )
         )
 
-    return GraphOut(
+    return GraphOut.model_construct(
         abstract_nodes=abstract_nodes_out,
         # impl_nodes = ACTIVE impls only (prevents leaking variants into other contexts)
         impl_nodes=[
-            ImplOut(
+            ImplOut.model_construct(
                 id=i.id,
                 abstract_id=i.abstract_id,
                 variant_key=i.variant_key,
@@ -216,7 +245,7 @@ async def build_focus_graph(*, session: AsyncSession, focus_abstract_id: UUID) -
             for i in state.inside_impls_active
         ],
         edges=[
-            EdgeOut(
+            EdgeOut.model_construct(
                 id=e.id,
                 src_impl_id=e.src_impl_id,
                 dst_impl_id=e.dst_impl_id,
@@ -230,6 +259,65 @@ async def build_focus_graph(*, session: AsyncSession, focus_abstract_id: UUID) -
     )
 
 
+# ----------------------------
+# Serialized focus cache
+# ----------------------------
+
+# (graph_version, focus id) -> JSON body. A write bumps the version: the first
+# lookup after it drops the old entries, and a build that raced the write is
+# stored under the old version, so it is never served.
+FOCUS_CACHE_SIZE = 256
+_focus_json: OrderedDict[tuple[int, UUID], bytes] = OrderedDict()
+_focus_json_version = -1
+
+
+@dataclass(slots=True)
+class _KeyLock:
+    lock: asyncio.Lock
+    users: int = 0  # holder + waiters; the entry goes only when none are left
+
+
+# one build per key at a time; concurrent misses wait for it instead of piling on the DB
+_focus_locks: dict[tuple[int, UUID], _KeyLock] = {}
+
+
+async def build_focus_graph_json(*, session: AsyncSession, focus_abstract_id: UUID) -> bytes:
+    global _focus_json_version
+    version = graph_version()
+    if version != _focus_json_version:
+        _focus_json.clear()
+        _focus_json_version = version
+
+    key = (version, focus_abstract_id)
+    body = _focus_json.get(key)
+    if body is not None:
+        _focus_json.move_to_end(key)
+        return body
+
+    entry = _focus_locks.get(key)
+    if entry is None:
+        entry = _focus_locks[key] = _KeyLock(asyncio.Lock())
+    entry.users += 1
+    try:
+        async with entry.lock:
+            body = _focus_json.get(key)
+            if body is None:
+                graph = await build_focus_graph(session=session, focus_abstract_id=focus_abstract_id)
+                body = GRAPH_OUT_ADAPTER.dump_json(graph)
+                # don't cache a body a write raced with; its key is already stale
+                if graph_version() == version:
+                    _focus_json[key] = body
+                    if len(_focus_json) > FOCUS_CACHE_SIZE:
+                        _focus_json.popitem(last=False)
+            return body
+    finally:
+        # a released lock can still have waiters about to wake; dropping it then
+        # would let a later arrival start a second build under a fresh lock
+        entry.users -= 1
+        if not entry.users:
+            del _focus_locks[key]
+
+
 # ----------------------------
 # Outgoing expansion helper
 # ----------------------------
@@ -238,8 +326,8 @@ def _collect_outgoing_concept_targets_to_include(
     *,
     inside_abs_ids: set[UUID],
     inside_impl_ids_active: set[UUID],
-    touching_edges_any_inside_impl: list[Edge],
-    impl_by_id: dict[UUID, ImplNode],
+    touching_edges_any_inside_impl: list[Row],
+    impl_to_abs: dict[UUID, UUID],
     abs_by_id: dict[UUID, AbstractNode],
 ) -> set[UUID]:
     """
@@ -256,11 +344,10 @@ def _collect_outgoing_concept_targets_to_include(
         if e.src_impl_id not in inside_impl_ids_active:
             continue  # ONLY outgoing from active inside
 
-        dst_impl = impl_by_id.get(e.dst_impl_id)
-        if not dst_impl:
+        dst_abs_id = impl_to_abs.get(e.dst_impl_id)
+        if dst_abs_id is None:
             continue
 
-        dst_abs_id = dst_impl.abstract_id
         if dst_abs_id in inside_abs_ids:
             continue
 
@@ -277,82 +364,106 @@ def _collect_outgoing_concept_targets_to_include(
 
 @dataclass(frozen=True)
 class _State:
-    inside_impls_all: list[ImplNode]
-    inside_impls_active: list[ImplNode]
+    inside_impls_all: list[Row]
+    inside_impls_active: list[Row]
     inside_impl_ids_active: set[UUID]
-    touching_edges_any_inside_impl: list[Edge]
+    touching_edges_any_inside_impl: list[Row]
+    # inside abstract id -> all its impl variants (active or not)
+    impls_by_abs: dict[UUID, list[Row]]
 
-    impl_by_id: dict[UUID, ImplNode]
+    # impl id -> abstract id, for every impl on a touching edge
+    impl_to_abs: dict[UUID, UUID]
     impl_ctx: dict[UUID, set[UUID]]
     abs_by_id: dict[UUID, AbstractNode]
+    # abstract id -> [self, parent, ..., root] (for abstracts referenced by edges + focus)
+    ancestors: dict[UUID, list[UUID]]
 
 
 async def _build_state(*, session: AsyncSession, focus: AbstractNode, inside_abs_ids: set[UUID]) -> _State:
     # 1) ALL impls for inside abstracts (variants included)
-    inside_impls_all = (
-        await session.execute(
-            select(ImplNode).where(ImplNode.abstract_id.in_(inside_abs_ids))
-        )
-    ).scalars().all()
-    inside_impl_ids_all = {i.id for i in inside_impls_all}
-
     # 2) contexts for those impls
-    impl_ctx: dict[UUID, set[UUID]] = {}
-    if inside_impl_ids_all:
-        rows = (
+    # 3) edges touching ANY inside impl (for boundary)
+    # All three only depend on inside_abs_ids (impls via subquery), so run them
+    # concurrently; 2) and 3) are plain rows on their own pooled sessions.
+    inside_impl_ids_q = select(ImplNode.id).where(_in_ids(ImplNode.abstract_id, inside_abs_ids))
+
+    async def fetch_inside_impls():
+        return (
             await session.execute(
-                select(ImplContext).where(ImplContext.impl_id.in_(inside_impl_ids_all))
+                select(*_IMPL_COLUMNS)
+                .where(_in_ids(ImplNode.abstract_id, inside_abs_ids))
+                .order_by(ImplNode.variant_key.collate("C"))  # codepoint order, locale-independent
             )
-        ).scalars().all()
-        for c in rows:
-            impl_ctx.setdefault(c.impl_id, set()).add(c.context_abstract_id)
+        ).all()
+
+    inside_impls_all, ctx_rows, edge_rows = await asyncio.gather(
+        fetch_inside_impls(),
+        fetch_all(
+            select(ImplContext.impl_id, ImplContext.context_abstract_id)
+            .where(ImplContext.impl_id.in_(inside_impl_ids_q))
+        ),
+        # two index-backed halves instead of an OR the planner may turn into a seq scan
+        fetch_all(
+            union_all(
+                select(*_EDGE_COLUMNS).where(Edge.src_impl_id.in_(inside_impl_ids_q)),
+                select(*_EDGE_COLUMNS).where(Edge.dst_impl_id.in_(inside_impl_ids_q)),
+            )
+        ),
+    )
+    # edges with both ends inside come back from both halves: dedupe them and
+    # collect the impls they reference in the same pass
+    edges_by_id: dict[UUID, Row] = {}
+    edge_impl_ids: set[UUID] = set()
+    for e in edge_rows:
+        if e.id not in edges_by_id:
+            edges_by_id[e.id] = e
+            edge_impl_ids.add(e.src_impl_id)
+            edge_impl_ids.add(e.dst_impl_id)
+    touching_edges_any_inside_impl = list(edges_by_id.values())
+
+    impl_ctx: dict[UUID, set[UUID]] = {}
+    for impl_id, context_abstract_id in ctx_rows:
+        impl_ctx.setdefault(impl_id, set()).add(context_abstract_id)
 
     # Active rule: global if no ImplContext rows, otherwise must match focus id
     def impl_is_active_in_focus(impl_id: UUID) -> bool:
         ctxs = impl_ctx.get(impl_id)
         return (ctxs is None) or (focus.id in ctxs)
 
-    inside_impls_active = [i for i in inside_impls_all if impl_is_active_in_focus(i.id)]
-    inside_impl_ids_active = {i.id for i in inside_impls_active}
-
-    # 3) edges touching ANY inside impl (for boundary)
-    touching_edges_any_inside_impl: list[Edge] = []
-    if inside_impl_ids_all:
-        touching_edges_any_inside_impl = (
+    # one pass: active impls (+ ids) and ALL variants grouped by abstract
+    inside_impls_active: list[Row] = []
+    inside_impl_ids_active: set[UUID] = set()
+    impls_by_abs: defaultdict[UUID, list[Row]] = defaultdict(list)
+    for i in inside_impls_all:
+        impls_by_abs[i.abstract_id].append(i)
+        if impl_is_active_in_focus(i.id):
+            inside_impls_active.append(i)
+            inside_impl_ids_active.add(i.id)
+
+    # 4+5) impls referenced by those edges, joined with their abstracts (+ focus)
+    impl_to_abs: dict[UUID, UUID] = {}
+    abs_by_id: dict[UUID, AbstractNode] = {focus.id: focus}
+    if edge_impl_ids:
+        rows = (
             await session.execute(
-                select(Edge).where(
-                    (Edge.src_impl_id.in_(inside_impl_ids_all)) |
-                    (Edge.dst_impl_id.in_(inside_impl_ids_all))
-                )
+                select(ImplNode.id, AbstractNode)
+                .join(AbstractNode, AbstractNode.id == ImplNode.abstract_id)
+                .options(_NO_LAZY)
+                .where(_in_ids(ImplNode.id, edge_impl_ids))
             )
-        ).scalars().all()
+        ).all()
+        for impl_id, a in rows:
+            impl_to_abs[impl_id] = a.id
+            abs_by_id[a.id] = a
 
-    # 4) load impls referenced by those edges
-    edge_impl_ids = {e.src_impl_id for e in touching_edges_any_inside_impl} | {e.dst_impl_id for e in touching_edges_any_inside_impl}
-
-    edge_impls: list[ImplNode] = []
-    if edge_impl_ids:
-        edge_impls = (
-            await session.execute(select(ImplNode).where(ImplNode.id.in_(edge_impl_ids)))
-        ).scalars().all()
-
-    impl_by_id: dict[UUID, ImplNode] = {i.id: i for i in edge_impls}
-
-    # 5) load abstracts referenced by those impls (+ focus)
-    abs_ids = {i.abstract_id for i in edge_impls} | {focus.id}
-    abstracts = (
-        await session.execute(select(AbstractNode).where(AbstractNode.id.in_(abs_ids)))
-    ).scalars().all()
-    abs_by_id: dict[UUID, AbstractNode] = {a.id: a for a in abstracts}
-
-    await _preload_ancestors(session=session, abs_by_id=abs_by_id)
+    ancestors = await _load_ancestors(session=session, abs_by_id=abs_by_id)
 
     log.debug(
         "BUILD_STATE inside_impls_all=%s inside_impls_active=%s edges_any_inside=%s edge_impls=%s abs_by_id=%s impl_ctx_keys=%s",
         len(inside_impls_all),
         len(inside_impls_active),
         len(touching_edges_any_inside_impl),
-        len(edge_impls),
+        len(impl_to_abs),
         len(abs_by_id),
         len(impl_ctx),
     )
@@ -362,9 +473,11 @@ async def _build_state(*, session: AsyncSession, focus: AbstractNode, inside_abs
         inside_impls_active=inside_impls_active,
         inside_impl_ids_active=inside_impl_ids_active,
         touching_edges_any_inside_impl=touching_edges_any_inside_impl,
-        impl_by_id=impl_by_id,
+        impls_by_abs=impls_by_abs,
+        impl_to_abs=impl_to_abs,
         impl_ctx=impl_ctx,
         abs_by_id=abs_by_id,
+        ancestors=ancestors,
     )
 
 
@@ -372,35 +485,24 @@ async def _build_state(*, session: AsyncSession, focus: AbstractNode, inside_abs
 # Ancestor helpers
 # ----------------------------
 
-def _build_ancestor_set(focus: AbstractNode, abs_by_id: dict[UUID, AbstractNode]) -> set[UUID]:
-    ids: set[UUID] = set()
-    cur = focus
-    while True:
-        ids.add(cur.id)
-        if cur.parent_id is None:
-            break
-        nxt = abs_by_id.get(cur.parent_id)
-        if nxt is None:
-            break
-        cur = nxt
-    return ids
-
-
-async def _preload_ancestors(*, session: AsyncSession, abs_by_id: dict[UUID, AbstractNode]) -> None:
-    missing: set[UUID] = set()
-
-    for a in list(abs_by_id.values()):
-        pid = a.parent_id
-        if pid is not None and pid not in abs_by_id:
-            missing.add(pid)
-
-    while missing:
-        rows = (
-            await session.execute(select(AbstractNode).where(AbstractNode.id.in_(missing)))
-        ).scalars().all()
+async def _load_ancestors(*, session: AsyncSession, abs_by_id: dict[UUID, AbstractNode]) -> dict[UUID, list[UUID]]:
+    """
+    Ancestor chain (self first, then parent, ... root) for every abstract in abs_by_id,
+    read from the abstract_ancestors closure table in one query. Ancestors that
+    weren't loaded yet are added to abs_by_id.
+    """
+    rows = (
+        await session.execute(
+            select(AbstractAncestor.descendant_id, AbstractNode)
+            .join(AbstractNode, AbstractNode.id == AbstractAncestor.ancestor_id)
+            .options(_NO_LAZY)
+            .where(_in_ids(AbstractAncestor.descendant_id, abs_by_id))
+            .order_by(AbstractAncestor.descendant_id, AbstractAncestor.depth)
+        )
+    ).all()
 
-        missing.clear()
-        for p in rows:
-            abs_by_id[p.id] = p
-            if p.parent_id is not None and p.parent_id not in abs_by_id:
-                missing.add(p.parent_id)
+    ancestors: dict[UUID, list[UUID]] = {}
+    for descendant_id, a in rows:
+        abs_by_id.setdefault(a.id, a)
+        ancestors.setdefault(descendant_id, []).append(a.id)
+    return ancestors
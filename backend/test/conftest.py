@@ -1,7 +1,8 @@
 import asyncio
 import pytest
+from sqlalchemy import event
 
-from app.db import async_session_maker, engine
+from app.db import get_engine, get_session_maker
 from app.seed import seed_minimal
 
 
@@ -17,15 +18,28 @@ def event_loop():
 async def _dispose_engine_after_tests():
     yield
     # ensure pool is cleaned up
-    await engine.dispose()
+    await get_engine().dispose()
 
 
 @pytest.fixture()
 async def session():
-    async with async_session_maker() as s:
+    async with get_session_maker()() as s:
         yield s
 
 
 @pytest.fixture(autouse=True)
 async def reseed_db(session):
     await seed_minimal(session)
+
+
+@pytest.fixture()
+def count_queries():
+    """List that collects every SQL statement sent on the engine while the test runs."""
+    statements: list[str] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(get_engine().sync_engine, "before_cursor_execute", on_execute)
+    yield statements
+    event.remove(get_engine().sync_engine, "before_cursor_execute", on_execute)
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.exc import DBAPIError
+
+from app.models import AbstractAncestor, AbstractNode
+from helpers import abs_id_by_slug
+
+pytestmark = pytest.mark.asyncio
+
+
+async def ancestor_slugs(session, slug: str) -> list[str]:
+    anc = AbstractNode.__table__.alias("anc")
+    rows = (
+        await session.execute(
+            select(anc.c.slug)
+            .select_from(AbstractAncestor)
+            .join(AbstractNode, AbstractNode.id == AbstractAncestor.descendant_id)
+            .join(anc, anc.c.id == AbstractAncestor.ancestor_id)
+            .where(AbstractNode.slug == slug)
+            .order_by(AbstractAncestor.depth)
+        )
+    ).scalars().all()
+    return list(rows)
+
+
+async def test_closure_follows_seeded_hierarchy(session) -> None:
+    assert await ancestor_slugs(session, "math") == ["math"]
+    assert await ancestor_slugs(session, "calc") == ["calc", "math"]
+
+
+async def test_closure_follows_reparenting(session) -> None:
+    physics_id = await abs_id_by_slug(session, "physics")
+    await session.execute(
+        update(AbstractNode).where(AbstractNode.slug == "math").values(parent_id=physics_id)
+    )
+
+    assert await ancestor_slugs(session, "calc") == ["calc", "math", "physics"]
+
+    await session.rollback()
+
+
+async def test_reparenting_under_own_descendant_is_rejected(session) -> None:
+    calc_id = await abs_id_by_slug(session, "calc")
+    with pytest.raises(DBAPIError, match="parent_id cycle"):
+        await session.execute(
+            update(AbstractNode).where(AbstractNode.slug == "math").values(parent_id=calc_id)
+        )
+
+    await session.rollback()
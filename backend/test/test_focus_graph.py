@@ -1,8 +1,16 @@
+import asyncio
+
 import pytest
 import httpx
 from httpx import AsyncClient
+from sqlalchemy import delete, select
 
+from app.db import export_snapshot, session_scope, stream_all
 from app.main import app
+from app.models import RelatedEdge
+from app.schemas import GRAPH_OUT_ADAPTER
+from app.services import graph_focus
+from app.services.graph import invalidate_graph_cache
 from helpers import slugs_api, hint_pairs_api, hint_counts_api, abs_id_by_slug, focus
 
 pytestmark = pytest.mark.asyncio
@@ -57,3 +65,107 @@ async def test_focus_math_does_not_include_qm_or_ss_as_nodes_but_hints_external_
         # math should see incoming requires from Phys & DSP as boundary hints
         assert ("Phys", "requires") in pairs
         assert ("DSP", "requires") in pairs
+
+
+async def test_full_graph_and_focus_load_without_lazy_loads(session) -> None:
+    # builders run under raiseload("*"): any implicit relationship load would 500 here
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/api/graph/")
+        assert r.status_code == 200
+        assert "fourier-transform" in slugs_api(r.json())
+
+        math_id = await abs_id_by_slug(session, "math")
+        await focus(client, math_id)
+
+
+async def test_focus_query_count_is_bounded(session, count_queries) -> None:
+    # guards against N+1 regressions: the focus build is a fixed number of batched
+    # queries. Physics pulls in an outgoing concept target (Fourier), so:
+    #   focus, children,
+    #   state: impls, impl contexts, touching edges, outside impls, ancestors,
+    #   extra abstracts,
+    #   state again over the expanded inside set (5)
+    physics_id = await abs_id_by_slug(session, "physics")
+    count_queries.clear()
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await focus(client, physics_id)
+
+    assert len(count_queries) == 13, count_queries
+
+
+async def test_full_graph_query_count_is_constant(count_queries) -> None:
+    # abstracts (+ aggregates), impls, edges, related: one query each, whatever
+    # the size; plus pg_export_snapshot() and a SET TRANSACTION SNAPSHOT on each
+    # of the three streaming sessions
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/api/graph/")
+        assert r.status_code == 200
+        assert len(count_queries) == 8, count_queries
+
+        # served from the cached body until the next write
+        count_queries.clear()
+        r = await client.get("/api/graph/")
+        assert r.status_code == 200
+        assert count_queries == []
+
+
+async def test_graph_streams_read_the_exported_snapshot(session) -> None:
+    # a write committed after the export stays invisible to the helper sessions
+    snapshot = await export_snapshot(session)
+    async with session_scope() as writer:
+        await writer.execute(delete(RelatedEdge))
+        await writer.commit()
+
+    rows = [row async for row in stream_all(select(RelatedEdge.a_id), snapshot=snapshot)]
+    assert rows
+    await session.rollback()
+
+
+async def test_unvalidated_outputs_match_the_schema(session) -> None:
+    # builders skip validation (model_construct); the bytes must still validate
+    # and round-trip unchanged
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        physics_id = await abs_id_by_slug(session, "physics")
+        for url in ("/api/graph/", f"/api/graph/focus/{physics_id}"):
+            r = await client.get(url)
+            assert r.status_code == 200
+            assert GRAPH_OUT_ADAPTER.dump_json(GRAPH_OUT_ADAPTER.validate_json(r.content)) == r.content
+
+
+async def test_concurrent_focus_misses_share_one_build(session, monkeypatch) -> None:
+    real_build = graph_focus.build_focus_graph
+    builds = 0
+
+    async def slow_build(**kwargs):
+        nonlocal builds
+        builds += 1
+        await asyncio.sleep(0.05)  # keep the lock held while the others queue up
+        return await real_build(**kwargs)
+
+    monkeypatch.setattr(graph_focus, "build_focus_graph", slow_build)
+    invalidate_graph_cache()
+    physics_id = await abs_id_by_slug(session, "physics")
+
+    async def fetch() -> bytes:
+        async with session_scope() as s:
+            return await graph_focus.build_focus_graph_json(session=s, focus_abstract_id=physics_id)
+
+    bodies = await asyncio.gather(*(fetch() for _ in range(5)))
+    assert builds == 1
+    assert len(set(bodies)) == 1
+    assert graph_focus._focus_locks == {}
+
+
+async def test_focus_body_built_across_a_write_is_not_cached(session, monkeypatch) -> None:
+    real_build = graph_focus.build_focus_graph
+
+    async def racing_build(**kwargs):
+        graph = await real_build(**kwargs)
+        invalidate_graph_cache()  # a write commits while the body is being built
+        return graph
+
+    monkeypatch.setattr(graph_focus, "build_focus_graph", racing_build)
+    physics_id = await abs_id_by_slug(session, "physics")
+
+    await graph_focus.build_focus_graph_json(session=session, focus_abstract_id=physics_id)
+    assert graph_focus._focus_json == {}
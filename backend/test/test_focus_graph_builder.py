@@ -15,4 +15,5 @@ async def test_physics_focus_contains_fourier_and_has_expected_boundary_hints(se
 
     pairs = hint_pairs_builder(g)
     assert ("Math", "recommended") in pairs
-    assert ("DSP", "requires") in pairs
\ No newline at end of file
+    assert ("DSP", "requires") in pairs
+
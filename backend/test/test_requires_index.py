@@ -0,0 +1,88 @@
+import random
+import uuid
+
+import pytest
+
+from app.logic.graph import RequiresIndex, would_create_cycle
+
+
+def _ids(n: int) -> list[uuid.UUID]:
+    return [uuid.uuid4() for _ in range(n)]
+
+
+def test_chain_accepts_forward_edges_and_rejects_back_edges() -> None:
+    a, b, c, d = _ids(4)
+    index = RequiresIndex([(a, b), (b, c)])
+
+    assert not index.would_create_cycle(a, c)
+    assert not index.would_create_cycle(c, d)  # d has no edges yet
+    assert index.would_create_cycle(c, a)
+    assert index.would_create_cycle(b, b)
+
+    index.add(c, d)
+    with pytest.raises(ValueError):
+        index.add(d, a)
+    # a rejected edge leaves the index unchanged
+    assert not index.would_create_cycle(a, d)
+
+
+def test_cyclic_initial_edges() -> None:
+    a, b, c = _ids(3)
+    with pytest.raises(ValueError):
+        RequiresIndex([(a, b), (b, a)])
+    # the one-off helper keeps its bool contract: still cyclic with any new edge
+    assert would_create_cycle([(a, b), (b, a)], (a, c))
+    assert not would_create_cycle([(a, b)], (b, c))
+
+
+def _assert_topological(index: RequiresIndex, edges: list[tuple[uuid.UUID, uuid.UUID]]) -> None:
+    order = index._ord
+    assert all(order[a] < order[b] for a, b in edges)
+    assert sorted(order.values()) == list(range(len(order)))
+
+
+def test_add_against_current_order_reorders_only_what_it_must() -> None:
+    a, b, c, d = _ids(4)
+    index = RequiresIndex()
+    index.add(c, d)  # c=0, d=1
+    index.add(a, b)  # a=2, b=3
+    before = dict(index._ord)
+
+    # b -> c runs against the current order: {a, b} must move ahead of {c, d}
+    index.add(b, c)
+    _assert_topological(index, [(c, d), (a, b), (b, c)])
+    assert index._ord != before
+    # the reordered index still sees the new path
+    assert index.would_create_cycle(d, a)
+    assert not index.would_create_cycle(a, d)
+
+
+def _reaches(edges: list[tuple[uuid.UUID, uuid.UUID]], start: uuid.UUID, goal: uuid.UUID) -> bool:
+    seen, stack = {start}, [start]
+    while stack:
+        n = stack.pop()
+        if n == goal:
+            return True
+        for a, b in edges:
+            if a == n and b not in seen:
+                seen.add(b)
+                stack.append(b)
+    return False
+
+
+def test_incremental_adds_match_brute_force_reachability() -> None:
+    rng = random.Random(0)
+    nodes = _ids(10)
+    index = RequiresIndex()
+    edges: list[tuple[uuid.UUID, uuid.UUID]] = []
+    for _ in range(60):
+        src, dst = rng.sample(nodes, 2)
+        expected = _reaches(edges, dst, src)
+        assert index.would_create_cycle(src, dst) == expected
+        if expected:
+            with pytest.raises(ValueError):
+                index.add(src, dst)
+        else:
+            index.add(src, dst)
+            edges.append((src, dst))
+        _assert_topological(index, edges)
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.models import AbstractAncestor, AbstractNode, AbstractNodeKind, Edge, EdgeType, ImplNode, RelatedEdge
+from app.seed import _COPY_MIN_ROWS, SeedSpec, seed_from_spec
+
+pytestmark = pytest.mark.asyncio
+
+
+async def count(session, stmt) -> int:
+    return (await session.execute(stmt)).scalar_one()
+
+
+async def test_large_spec_goes_through_copy(session) -> None:
+    # every table above the threshold, so each one takes the COPY path
+    n = _COPY_MIN_ROWS + 10
+    slugs = [f"n{i}" for i in range(n)]
+    spec = SeedSpec(
+        abstract_nodes=[dict(slug="root", title="Root", short_title="Root", kind="group")]
+        + [dict(slug=s, title=s, short_title=s, parent="root") for s in slugs],
+        impl_nodes=[dict(abstract=s) for s in slugs]
+        + [dict(abstract=s, variant_key="alt", context="root") for s in slugs],
+        requires=[[[a, "core"], [b, "core"]] for a, b in zip(slugs, slugs[1:])],
+        recommended=[[[s, "alt"], [s, "core"], 1] for s in slugs],
+        related=[[a, b] for a, b in zip(slugs, slugs[1:])],
+    )
+    await seed_from_spec(session, spec)
+
+    assert await count(session, select(func.count()).select_from(AbstractNode)) == n + 1
+    assert await count(session, select(func.count()).where(AbstractNode.kind == AbstractNodeKind.group)) == 1
+    assert await count(session, select(func.count()).select_from(ImplNode)) == 2 * n
+    # edge types go in as SMALLINT codes and read back as the enum
+    assert await count(session, select(func.count()).where(Edge.type == EdgeType.requires)) == n - 1
+    assert await count(session, select(func.count()).where(Edge.type == EdgeType.recommended, Edge.rank == 1)) == n
+    assert await count(session, select(func.count()).select_from(RelatedEdge)) == n - 1
+    # the closure triggers fire under COPY too: self row for every node, plus root for its children
+    assert await count(session, select(func.count()).select_from(AbstractAncestor)) == 2 * n + 1
+
+
+async def test_cyclic_spec_is_rejected(session) -> None:
+    spec = SeedSpec(
+        abstract_nodes=[dict(slug=s, title=s, short_title=s) for s in ("a", "b")],
+        impl_nodes=[dict(abstract="a"), dict(abstract="b")],
+        requires=[[["a", "core"], ["b", "core"]], [["b", "core"], ["a", "core"]]],
+        recommended=[],
+        related=[],
+    )
+    with pytest.raises(RuntimeError, match="cycle"):
+        await seed_from_spec(session, spec)
+    await session.rollback()